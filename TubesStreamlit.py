@@ -1,15 +1,28 @@
 #Import Library
 import os
+import io
+import datetime
+import threading
+from collections import OrderedDict
 import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from streamlit_option_menu import option_menu
-import seaborn as sns
-import folium
 from streamlit_folium import st_folium
-import tensorflow as tf
-from sklearn.preprocessing import MinMaxScaler
+
+# Pengolahan data dan perhitungan analisis ada di kualitas_udara.py, visualisasinya di grafik_udara.py
+# dan peta_udara.py (juga dipakai oleh batch_analisis.py dan benchmark.py tanpa streamlit)
+import kualitas_udara as ku
+import grafik_udara as grafik
+import peta_udara as peta
+from instrumentasi import diukur, cache_miss, ukur_tahap
+import instrumentasi
+from kualitas_udara import (
+    folder_path, signature_dataset, versi_dataset, cek_data_masuk, koordinat_station,
+    label_kualitas_udara, breakpoint_aqi, polutan_cube, kolom_korelasi, faktor_meteorologi,
+    model_path, scaler_path, selected_features, n_input, prediksi_batch, prediksi_rekursif, deret_prediksi,
+)
 
 @st.cache_data
 #Load Data CSV
@@ -17,170 +30,233 @@ def load_data(url) :
     df = pd.read_csv(url)
     return df
 
-folder_path = "Dataset"
-
-df_list = []
-for file_name in os.listdir(path=folder_path):
-    if file_name.endswith(".csv"):
-        file_path = os.path.join(folder_path, file_name)
-        data = pd.read_csv(file_path)
-        df_list.append(data)
-
-df = pd.concat(df_list, ignore_index=True)
+cache_path = os.path.join(folder_path, ".cache")
 
-def cleaning_data(df) :
-
-    df_clean = df.drop(columns='No', axis=1)
-    # print(df_clean['station'].value_counts())
+@diukur(cache=True)
+@st.cache_data
+# Load, cleaning dan labeling dataset per chunk ke folder cache (lihat ku.siapkan_dataset), sekali per signature
+def siapkan_dataset(folder_path, signature):
+    cache_miss()
+    return ku.siapkan_dataset(folder_path, signature, cache_path)
+
+@diukur(cache=True)
+@st.cache_resource(max_entries=1)
+# State data yang bisa bertambah saat aplikasi berjalan, dimulai dari data bersih lengkap (dengan label) dan data 2014-2016
+# yang dibaca dari hasil cleaning per stasiun/tahun, hanya saat state dibuat (bukan setiap rerun)
+# dipakai bersama oleh semua sesi: frame dan index tidak diubah di tempat tetapi diganti dengan yang baru
+# hanya state signature terakhir yang disimpan, state dataset lama dilepas saat file dataset berubah
+def data_stream(signature, partisi_path, _stat_station):
+    cache_miss()
+    df_cleaned, df_filtered = ku.cleaning_data(partisi_path)
+    return ku.buat_stream(partisi_path, _stat_station, df_cleaned, df_filtered)
+
+@diukur(cache=True)
+@st.cache_data
+# Laporan memori per kolom (bytes) df_label sebelum dan sesudah skema ringkas, sekali per versi data
+def laporan_memori(_df_label, versi):
+    cache_miss()
+    return ku.laporan_memori(_df_label)
 
-    # Cek missing value
-    columns_numeric = df_clean.drop(columns=['wd','station']).columns
+@diukur(cache=True)
+@st.cache_data
+# Persentase nilai yang diisi interpolasi dan rata-rata musiman (gap mask df_label), sekali per versi data
+def ringkasan_imputasi(_df_label, versi):
+    cache_miss()
+    return ku.ringkasan_imputasi(_df_label)
+
+@diukur(cache=True)
+@st.cache_resource(max_entries=2)
+# Ranking setiap kolom di dalam setiap kelompok, dihitung sekali per versi data lalu dipakai ulang (read-only)
+# max_entries sesuai banyak kelompok yang dipakai (seluruh data dan per stasiun per bulan), ranking versi data lama dilepas
+def ranking_kolom(_df_filtered, versi, kelompok=()):
+    cache_miss()
+    return ku.ranking_kolom(_df_filtered, kelompok)
+
+@diukur(cache=True)
+@st.cache_data
+# Korelasi spearman per kelompok dari ranking yang sudah di-cache (lihat ku.korelasi_spearman)
+def korelasi_spearman(_df_filtered, versi, kelompok=()):
+    cache_miss()
+    return ku.korelasi_ranking(ranking_kolom(_df_filtered, versi, kelompok))
 
-    for col in columns_numeric:
-        if df_clean[col].isna().sum() > 0:
-            df_clean[col] = df_clean.groupby('station')[col].transform(lambda x: x.fillna(x.mean()))
+@diukur(cache=True)
+@st.cache_data
+# Index episode polusi PM2.5 per kategori dari cube (lihat ku.index_episode), sekali per versi data
+def index_episode(_cube, _waktu_awal, _stations, versi):
+    cache_miss()
+    return ku.index_episode(_cube, _waktu_awal, _stations)
+
+# Callback tombol episode: pilihan Dashboard diganti ke jam puncak episode sebelum widget dibuat ulang
+def lompat_episode(episode):
+    waktu = episode['waktu_puncak']
+    st.session_state.update({
+        'dashboard_station': 'Pilih Semua',
+        'dashboard_year': waktu.year, 'dashboard_month': waktu.month,
+        'dashboard_day': waktu.day, 'dashboard_hour': waktu.hour,
+        'episode_terpilih': episode,
+    })
+
+@diukur(cache=True)
+@st.cache_data
+# Wind rose dan arah sumber polutan per stasiun (lihat ku.analisis_arah_angin), sekali per versi data dan polutan
+def analisis_arah_angin(_df_filtered, versi, polutan):
+    cache_miss()
+    return ku.analisis_arah_angin(_df_filtered, polutan)
 
-    df_clean['wd'] = df_clean['wd'].ffill()
-    # print(df_clean.isna().sum())
-    return df_clean
+@diukur(cache=True)
+@st.cache_data
+# Bagian perhitungan analisis dipisah dari visualisasi: hanya perhitungan yang di-cache,
+# dikunci dengan versi dataset (argumen berawalan '_' tidak di-hash oleh streamlit)
+def hitung_ratu1(_rollups, versi):
+    cache_miss()
+    return ku.hitung_ratu1(_rollups)
 
-# cleaning dataframe
-df_filtered = cleaning_data(df)[~cleaning_data(df)['year'].isin([2013, 2017])]
-df_filtered = df_filtered.reset_index(drop=True)
+def hitung_ratu2(_df_filtered, versi):
+    corr_factors = korelasi_spearman(_df_filtered, versi) # menggunakan metode spearman untuk data berdistribusi tidak normal
+    return corr_factors
 
+@diukur(cache=True)
 @st.cache_data
-def labeling_udara(df_cleaned) :
-    df_tes = df_cleaned.copy()
-    df_tes['datetime'] = pd.to_datetime(df_tes[['year', 'month', 'day', 'hour']])
-    df_tes['label'] = df_tes['PM2.5'].apply(label_pm25)
-
-    # Koordinat stasiun yang sudah ada
-    stations = [
-        {"name": "Aotizhongxin", "lat": 39.9996, "lon": 116.4187},
-        {"name": "Changping", "lat": 40.2203, "lon": 116.2319},
-        {"name": "Dingling", "lat": 39.9391, "lon": 116.2883},
-        {"name": "Dongsi", "lat": 39.9335, "lon": 116.4206},
-        {"name": "Guanyuan", "lat": 39.9515, "lon": 116.3198},
-        {"name": "Gucheng", "lat": 39.9167, "lon": 116.2627},
-        {"name": "Huairou", "lat": 40.3125, "lon": 116.6347},
-        {"name": "Nongzhanguan", "lat": 39.9934, "lon": 116.3493},
-        {"name": "Shunyi", "lat": 40.1305, "lon": 116.6530},
-        {"name": "Tiantan", "lat": 39.8825, "lon": 116.4179},
-        {"name": "Wanliu", "lat": 39.9575, "lon": 116.3190},
-        {"name": "Wanshouxigong", "lat": 39.8887, "lon": 116.3066}
-    ]
-
-    # Buat dictionary untuk mencari lat dan lon berdasarkan station
-    station_coordinates = {station["name"]: {"lat": station["lat"], "lon": station["lon"]} for station in stations}
+def hitung_salsa1(_rollups, versi):
+    cache_miss()
+    return ku.hitung_salsa1(_rollups)
 
-    # Tambahkan kolom lat dan lon berdasarkan station
-    df_tes["lat"] = df["station"].map(lambda x: station_coordinates.get(x, {}).get("lat"))
-    df_tes["lon"] = df["station"].map(lambda x: station_coordinates.get(x, {}).get("lon"))
+@diukur(cache=True)
+@st.cache_data
+def hitung_rafly1(_rollups, versi):
+    cache_miss()
+    return ku.hitung_rafly1(_rollups)
 
-    return df_tes
+@diukur(cache=True)
+@st.cache_data
+def hitung_rafly2(_rollups, versi):
+    cache_miss()
+    return ku.hitung_rafly2(_rollups)
 
+@diukur(cache=True)
 @st.cache_data
-# membuat function untuk labeling
-def label_pm25(value):
-    if 0 < value <= 35:
-        return 'good'
-    elif 35 < value <= 75:
-        return 'moderate'
-    elif 75 < value <= 115:
-        return 'unhealthy for sensitive groups'
-    elif 115 < value <= 150:
-        return 'unhealthy'
-    elif 150 < value <= 250:
-        return 'very unhealthy'
-    elif value > 250:
-        return 'hazardous'
+def hitung_army1(_rollups, versi):
+    cache_miss()
+    return ku.hitung_army1(_rollups)
+
+@diukur(cache=True)
+@st.cache_resource
+# Load model sekali per proses, tensorflow baru di-import saat model dibutuhkan
+# mengembalikan model dan waktu load serta waktu inferensi pertama (detik)
+def load_model(model_path):
+    cache_miss()
+    return ku.muat_model(model_path)
+
+@diukur(cache=True)
+@st.cache_resource
+# Load parameter scaler training, diurutkan sesuai selected_features
+def load_scaler(scaler_path):
+    cache_miss()
+    return ku.muat_scaler(scaler_path)
+
+@diukur(cache=True)
+@st.cache_resource(max_entries=64)
+# Fungsi untuk membuat peta dari array lat, lon, kode label, nilai PM2.5 dan nama station
+# (argumen berawalan '_' tidak di-hash, cache cukup dikunci dengan key waktu dan station terpilih)
+# jumlah peta yang disimpan dibatasi agar memori server tidak terus bertambah saat banyak jam dibuka
+def create_map(key, _lat, _lon, _kode_label, _nilai, _station):
+    cache_miss()
+    return peta.buat_peta(_lat, _lon, _kode_label, _nilai, _station)
+
+# Panjang animasi peta dalam jam
+periode_animasi = {'1 Hari': 24, '1 Minggu': 24 * 7, '1 Bulan': 24 * 30}
+
+@diukur(cache=True)
+@st.cache_resource(max_entries=8)
+# Fungsi untuk membuat peta animasi, _nilai adalah slice cube berukuran (stasiun x jam) untuk satu polutan
+# (animasi berjalan di browser, server hanya membangun layer sekali per key)
+# hanya beberapa animasi yang disimpan karena animasi satu bulan berisi ribuan titik
+def create_animated_map(key, _nilai, _stations, waktu_mulai, polutan):
+    cache_miss()
+    return peta.buat_peta_animasi(_nilai, _stations, waktu_mulai, polutan)
+
+# Cache gambar grafik: di memori (LRU) dan di disk, satu gambar per grafik per versi data
+figure_cache_path = os.path.join(cache_path, "figures")
+figure_cache_size = 32
+
+# Versi kode grafik, dinaikkan jika tampilan grafik atau arti datanya berubah agar gambar lama di disk tidak dipakai lagi
+versi_figure = 2
+
+# Jumlah gambar maksimal di disk, yang paling lama tidak dipakai (mtime) dihapus lebih dulu
+figure_disk_size = 256
+
+# Hapus gambar di disk yang paling lama tidak dipakai jika jumlahnya melebihi figure_disk_size
+# (gambar versi data lama otomatis terhapus karena tidak pernah dipakai lagi)
+def pangkas_figure_disk():
+    files = [entry for entry in os.scandir(figure_cache_path) if entry.is_file() and not entry.name.endswith(".tmp")]
+    if len(files) > figure_disk_size:
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:len(files) - figure_disk_size]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+@st.cache_resource
+# Cache memori dibagi ke semua sesi, lock dipakai karena pyplot tidak thread-safe
+def figure_cache():
+    return OrderedDict(), threading.Lock()
+
+# Render grafik sekali per versi data, selanjutnya tampilkan dari bytes gambar yang tersimpan
+# plot adalah fungsi tanpa argumen yang menggambar grafik dan mengembalikan figure-nya
+# simpan_disk=False untuk grafik yang jarang dipakai ulang (hanya disimpan di memori)
+def tampilkan_figure(nama, versi, plot, format='png', simpan_disk=True):
+    cache, lock = figure_cache()
+    key = f"{nama}-{versi_dataset((versi_figure, versi))}.{format}"
+    path = os.path.join(figure_cache_path, key)
+
+    with lock, ukur_tahap(f"figure:{nama}", cache='hit') as tahap:
+        if key in cache:
+            cache.move_to_end(key)
+            gambar = cache[key]
+        elif simpan_disk and os.path.exists(path):
+            tahap['cache'] = 'disk'
+            with open(path, "rb") as f:
+                gambar = f.read()
+            # tandai baru dipakai agar tidak dihapus lebih dulu oleh pangkas_figure_disk
+            os.utime(path)
+        else:
+            tahap['cache'] = 'miss'
+            fig = plot()
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=format, bbox_inches='tight')
+            plt.close(fig)
+            gambar = buffer.getvalue()
+
+            if simpan_disk:
+                os.makedirs(figure_cache_path, exist_ok=True)
+                with open(path + ".tmp", "wb") as f:
+                    f.write(gambar)
+                os.replace(path + ".tmp", path)
+                pangkas_figure_disk()
+
+        cache[key] = gambar
+        while len(cache) > figure_cache_size:
+            cache.popitem(last=False)
+
+    if format == 'svg':
+        st.image(gambar.decode(), use_container_width=True)
     else:
-        return 'unknown'
+        st.image(gambar, use_container_width=True)
 
-@st.cache_data
-# Fungsi untuk membuat peta
-def create_map(filtered_df):
-    # Warna kualitas udara berdasarkan label
-    color_map = {
-        'good': 'green',
-        'moderate': 'yellow',
-        'unhealthy': 'red',
-        'unhealthy for sensitive groups': 'orange',
-        'very unhealthy': 'purple',
-        'hazardous': 'darkred'
-    }
-
-    # Buat peta dengan pusat di lokasi yang lebih umum (misalnya pusat China)
-    map_china = folium.Map(location=[40.09, 116.6], zoom_start=10)
-    
-    # Tambahkan marker untuk setiap stasiun yang terpilih
-    for _, row in filtered_df.iterrows():
-        folium.CircleMarker(
-            location=[row["lat"], row["lon"]],  # pastikan kolom lat dan lon ada
-            radius=15,
-            color=color_map.get(row["label"], 'blue'),
-            fill=True,
-            fill_color=color_map.get(row["label"], 'blue'),
-            fill_opacity=0.7,
-            popup=f"{row['station']} (PM2.5: {row['PM2.5']}, Label: {row['label']})",
-        ).add_to(map_china)
-    
-    return map_china
+@diukur()
+def ratu1(rollups, versi):
+    def plot_jumlah_hari():
+        df_polluted_summary, _ = hitung_ratu1(rollups, versi)
+        return grafik.plot_jumlah_hari(df_polluted_summary)
 
-@st.cache_data
-def ratu1(df_filtered):
-    # komponen polutan
-    polutan = ['PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3']
-
-    # menghitung rata rata polutan per hari untuk setiap tahun dan setiap stasiun
-    df_daily = df_filtered.groupby(["station", "year", "month", "day"])[polutan].mean().reset_index()
-
-    # menghitung total rata-rata polutan per hari
-    df_daily["polutan_average"] = df_daily[polutan].mean(axis=1)
-
-    # batas maksimum sudah di tentukan di awal analisis
-    threshold = 38.67
-
-    # menentukan stasiun yang menghadapi masalah polusi dimana rata-rata polutan > batas maksimum
-    df_polluted_stations = df_daily[df_daily["polutan_average"] > threshold]
-
-    # menampilkan stasiun yang memiliki masalah polusi beserta jumlah harinya
-    df_polluted_summary = df_polluted_stations.groupby("station")["day"].count().reset_index()
-    df_polluted_summary.columns = ["station", "jumlah_hari_terpolusi"]
-    
-    df_polluted_summary = df_polluted_summary.sort_values(by="jumlah_hari_terpolusi", ascending=False)
-
-    plt.figure(figsize=(12, 6))
-    sns.barplot(
-        data=df_polluted_summary,
-        x="station",
-        y="jumlah_hari_terpolusi",
-        hue="station",
-        palette="dark:skyblue"
-    )
-
-    plt.ylim(0, df_polluted_summary["jumlah_hari_terpolusi"].max() + 200)
-
-    plt.xlabel("Stasiun")
-    plt.ylabel("Jumlah Hari Terpolusi")
-    plt.title("Jumlah Hari dengan Polusi Tinggi per Stasiun")
-    plt.xticks(rotation=45)
-    st.pyplot(plt.gcf())
-
-    df_heatmap = df_polluted_stations.pivot_table(
-        index="station",
-        columns="day",
-        values="polutan_average",
-        aggfunc="mean"
-    )
-
-    plt.figure(figsize=(14, 6))
-    sns.heatmap(df_heatmap, cmap='Blues', linewidths=0.5)
-
-    plt.xlabel("Hari dalam Sebulan")
-    plt.ylabel("Stasiun")
-    plt.title("Distribusi Polusi di Setiap Stasiun")
-    st.pyplot(plt.gcf())
+    tampilkan_figure('ratu1_jumlah_hari', versi, plot_jumlah_hari)
+
+    def plot_distribusi():
+        _, df_heatmap = hitung_ratu1(rollups, versi)
+        return grafik.plot_distribusi(df_heatmap)
+
+    tampilkan_figure('ratu1_distribusi', versi, plot_distribusi)
 
     # Penjelasan
     with st.expander("Lihat Penjelasan"):
@@ -193,14 +269,41 @@ def ratu1(df_filtered):
             """
         )
 
-@st.cache_data
-def ratu2(df_filtered):
-    corr_factors = df_filtered.drop(columns=['year', 'month', 'day', 'hour', 'wd', 'station']).corr(method='spearman') # menggunakan metode spearman untuk data berdistribusi tidak normal
-    
-    plt.figure(figsize=(10, 6))
-    sns.heatmap(corr_factors, annot=True, cmap="Blues", fmt=".2f", linewidths=0.5)
-    plt.title("Korelasi antara Faktor Meteorologi dan Polutan")
-    st.pyplot(plt.gcf())
+@diukur()
+def ratu2(df_filtered, versi):
+    def plot_korelasi():
+        return grafik.plot_korelasi(hitung_ratu2(df_filtered, versi))
+
+    tampilkan_figure('ratu2_korelasi', versi, plot_korelasi)
+
+    # Perubahan korelasi faktor meteorologi dengan satu polutan per bulan pada stasiun terpilih
+    with st.expander("Perubahan Korelasi per Bulan"):
+        station = st.selectbox("Pilih Station:", df_filtered['station'].cat.categories.tolist(), key='ratu2_station')
+        polutan = st.selectbox("Pilih Polutan:", [kolom for kolom in kolom_korelasi if kolom not in faktor_meteorologi], key='ratu2_polutan')
+
+        def plot_korelasi_bulanan():
+            corr_bulanan = korelasi_spearman(df_filtered, versi, ('station', 'year', 'month'))
+            return grafik.plot_korelasi_bulanan(corr_bulanan, station, polutan)
+
+        tampilkan_figure(f'ratu2_korelasi_bulanan_{station}_{polutan}', versi, plot_korelasi_bulanan, simpan_disk=False)
+
+    # Arah angin (wd) tidak ikut dikorelasikan, dianalisis terpisah: wind rose dan polutan per arah angin
+    with st.expander("Arah Angin dan Polutan"):
+        station = st.selectbox("Pilih Station:", df_filtered['station'].cat.categories.tolist(), key='ratu2_arah_station')
+        polutan = st.selectbox("Pilih Polutan:", polutan_cube, key='ratu2_arah_polutan')
+        tabel, sumber = analisis_arah_angin(df_filtered, versi, polutan)
+
+        def plot_wind_rose():
+            return grafik.plot_wind_rose(tabel, sumber, station, polutan)
+
+        tampilkan_figure(f'ratu2_wind_rose_{station}_{polutan}', versi, plot_wind_rose, simpan_disk=False)
+
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            st.caption(f"Arah sumber {polutan} setiap stasiun (arah rata-rata angin berbobot konsentrasi, kekuatan 0-1)")
+            st.dataframe(sumber)
+        with col2:
+            st.image("img/arah_angin.png", caption="Arah mata angin", use_container_width=True)
 
     # pairplot_vars = ['TEMP', 'PRES', 'DEWP', 'RAIN', 'WSPM', 'PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3']
 
@@ -236,32 +339,12 @@ def ratu2(df_filtered):
             """
         )
 
-@st.cache_data
-def salsa1(df_filtered):
-    # Definisikan jam rush hour (7-9 pagi dan 5-7 sore)
-    rush_hours = df_filtered[(df_filtered['hour'] >= 7) & (df_filtered['hour'] <= 9) | (df_filtered['hour'] >= 17) & (df_filtered['hour'] <= 19)]
-    off_peak_hours = df_filtered[~((df_filtered['hour'] >= 7) & (df_filtered['hour'] <= 9) | (df_filtered['hour'] >= 17) & (df_filtered['hour'] <= 19))]
-
-    # Hitung rata-rata polutan untuk rush hour
-    rush_avg = rush_hours[['PM2.5', 'PM10', 'SO2']].mean()
-
-    # Hitung rata-rata polutan untuk off-peak hours
-    off_peak_avg = off_peak_hours[['PM2.5', 'PM10', 'SO2']].mean()
-
-    pollutants = ['PM2.5', 'PM10', 'SO2']
-    rush_values = rush_avg.values
-    off_peak_values = off_peak_avg.values
-
-    x = range(len(pollutants))
-    plt.figure(figsize=(10, 6))
-    plt.bar(x, rush_values, width=0.4, label='Jam Sibuk', align='center')
-    plt.bar(x, off_peak_values, width=0.4, label='Jam Tidak Sibuk', align='edge')
-    plt.xlabel('polutan')
-    plt.ylabel('Rata-Rata Konsentrasi Udara')
-    plt.title('Perbandingan Kualitas Udara Selama Jam Sibuk vs Jam Tidak Sibuk')
-    plt.xticks(ticks=x, labels=pollutants)
-    plt.legend()
-    st.pyplot(plt.gcf())
+@diukur()
+def salsa1(rollups, versi):
+    def plot_jam_sibuk():
+        return grafik.plot_jam_sibuk(*hitung_salsa1(rollups, versi))
+
+    tampilkan_figure('salsa1_jam_sibuk', versi, plot_jam_sibuk)
 
     #Penjelasan
     with st.expander("Lihat Penjelasan"):
@@ -273,38 +356,12 @@ def salsa1(df_filtered):
             * **SO2**: `Konsentrasi rata-rata SO2 sedikit lebih tinggi selama jam tidak sibuk`, tetapi perbedaan ini tidak signifikan. Ini bisa menunjukkan bahwa aktivitas lalu lintas tidak terlalu memengaruhi level SO2, atau sumber SO2 di wilayah ini mungkin berasal dari sumber tetap yang konsisten seperti industri.  
             """)
 
-@st.cache_data
-def rafly1(df_filtered):
-    # Filter data untuk station Tiantan dan tahun 2014-2016
-    tiantan_data = df_filtered[(df_filtered['station'] == 'Tiantan')].copy()
-
-    # Hitung rata-rata PM10 per bulan untuk setiap tahun
-    pm10_per_bulan = tiantan_data.groupby(['year', 'month'])['PM10'].mean().unstack()
-
-    # Mengganti angka bulan dengan nama bulan
-    nama_bulan = {
-        1: 'Januari', 2: 'Februari', 3: 'Maret', 4: 'April',
-        5: 'Mei', 6: 'Juni', 7: 'Juli', 8: 'Agustus',
-        9: 'September', 10: 'Oktober', 11: 'November', 12: 'Desember'
-    }
-    pm10_per_bulan.columns = [nama_bulan[col] for col in pm10_per_bulan.columns]
-
-    # Visualisasi rata-rata PM10 bulanan per tahun menggunakan seaborn lineplot
-    plt.figure(figsize=(14, 6))
-
-    for year in pm10_per_bulan.index:
-        plt.plot(pm10_per_bulan.columns, pm10_per_bulan.loc[year], label=str(year), marker='o')
-
-    plt.xlabel('Bulan', fontsize=12)
-    plt.ylabel('Rata-rata PM10', fontsize=12)
-    plt.title('Rata-rata PM10 Bulanan per Tahun (2014-2016) pada station tiantan', fontsize=14)
-    plt.xticks(rotation=45)
-    plt.grid(True)
-    plt.legend(title='Tahun')
-
-    # Menampilkan grafik
-    plt.tight_layout()
-    st.pyplot(plt.gcf())
+@diukur()
+def rafly1(rollups, versi):
+    def plot_pm10_bulanan():
+        return grafik.plot_pm10_bulanan(hitung_rafly1(rollups, versi))
+
+    tampilkan_figure('rafly1_pm10_bulanan', versi, plot_pm10_bulanan)
 
     #Penjelasan
     with st.expander("Lihat Penjelasan"):
@@ -314,40 +371,12 @@ def rafly1(df_filtered):
             Konsentrasi PM10 cenderung lebih tinggi pada musim dingin (November hingga Januari) daripada musim panas (Juni hingga Agustus) berdasarkan analisis distribusi rata-rata bulanan PM10 di Stasiun Tiantan dari 2014 hingga 2016. Jumlah tertinggi konsentrasi PM10 biasanya terjadi pada bulan Januari, disebabkan oleh peningkatan penggunaan bahan bakar fosil, kondisi atmosfer yang stabil, dan fenomena inversi suhu. Di sisi lain, selama bulan musim panas, hujan dan peningkatan kecepatan angin menurunkan konsentrasi PM10 secara signifikan. Pola ini menekankan bahwa pengendalian polusi selama musim dingin sangat penting untuk meningkatkan kualitas udara.
         """)
 
-@st.cache_data
-def rafly2(df_filtered):
-    # data untuk Stasiun Tiantan dan tahun 2016
-    tiantan_2016 = df_filtered[(df_filtered['station'] == 'Tiantan') & (df_filtered['year'] == 2016)]
-
-    # Memisahkan data untuk pagi (06:00 - 10:00)
-    data_pagi = tiantan_2016[(tiantan_2016['hour'] >= 6) & (tiantan_2016['hour'] <= 10)]
-
-    # Memisahkan data untuk sore (15:00 - 19:00)
-    data_sore = tiantan_2016[(tiantan_2016['hour'] >= 15) & (tiantan_2016['hour'] <= 19)]
-
-    # Menghitung rata-rata O₃ untuk pagi hari (06:00 - 10:00)
-    avg_o3_pagi = data_pagi['O3'].mean()
-
-    # Menghitung rata-rata O₃ untuk sore hari (15:00 - 19:00)
-    avg_o3_sore = data_sore['O3'].mean()
-
-    # Membuat bar chart perbandingan rata-rata O₃ antara pagi dan sore
-    plt.figure(figsize=(8, 5))
-    sns.barplot(x=['Pagi (06:00 - 10:00)', 'Sore (15:00 - 19:00)'], 
-            y=[avg_o3_pagi, avg_o3_sore], 
-            palette='Set2', 
-            hue=['Pagi', 'Sore'])
-
-    plt.title('Perbandingan Rata-rata Konsentrasi O₃ Pagi dan Sore di Stasiun Tiantan (2016)', fontsize=14)
-    plt.xlabel('Periode Waktu', fontsize=12)
-    plt.ylabel('Konsentrasi O₃ (µg/m³)', fontsize=12)
+@diukur()
+def rafly2(rollups, versi):
+    def plot_o3_pagi_sore():
+        return grafik.plot_o3_pagi_sore(*hitung_rafly2(rollups, versi))
 
-    # Menambahkan nilai di atas setiap bar
-    for i, value in enumerate([avg_o3_pagi, avg_o3_sore]):
-        plt.text(i, value + 0.2, f'{value:.2f}', ha='center', va='bottom', fontsize=12)
-
-    plt.tight_layout()
-    st.pyplot(plt.gcf())
+    tampilkan_figure('rafly2_o3_pagi_sore', versi, plot_o3_pagi_sore)
 
     #Penjelasan
     with st.expander("Lihat Penjelasan"):
@@ -357,29 +386,12 @@ def rafly2(df_filtered):
             Berdasarkan analisis data ozon di Stasiun Tiantan sepanjang tahun 2016, ada perbedaan yang signifikan dalam konsentrasi rata-rata ozon antara pagi dan sore hari. Pada waktu pagi, antara pukul 06:00 dan 10:00, konsentrasi ozon lebih rendah, mungkin karena proses fotokimia belum mencapai puncaknya karena intensitas sinar matahari yang masih rendah. Pada waktu sore, konsentrasi ozon meningkat secara signifikan dari pukul 15:00 hingga 19:00. Menurut tren ini, ozon adalah polutan sekunder yang sangat bergantung pada radiasi matahari dan suhu lingkungan.
         """)
 
-@st.cache_data
-def army1(df_filtered):
-
-    selected_columns = ['year', 'station', 'PM2.5', 'PM10']
-
-    # Memfilter data berdasarkan nama stasiun
-    stations_filter = ['Dingling', 'Guanyuan', 'Huairou']
-    # Filter by station and year
-    filter_data = df_filtered[(df_filtered['station'].isin(stations_filter)) & (df_filtered['year'] == 2015)][selected_columns]
-
-    # Menghitung rata-rata dari PM2.5 dan PM10
-    filter_data['PM_average'] = filter_data[['PM2.5', 'PM10']].mean(axis=1)
+@diukur()
+def army1(rollups, versi):
+    def plot_pm_stasiun():
+        return grafik.plot_pm_stasiun(hitung_army1(rollups, versi))
 
-    # Membuat bar plot
-    plt.figure(figsize=(12, 6))
-    sns.barplot(
-        data=filter_data.melt(id_vars=['station'], value_vars=['PM2.5', 'PM10'], var_name='Polutan', value_name='Konsentrasi'),
-        x='station', y='Konsentrasi', hue='Polutan', ci=None, palette=['blue', 'green'] 
-    )
-    plt.xlabel('Stasiun')
-    plt.ylabel('Konsentrasi (µg/m³)')
-    plt.title('Rata-rata Konsentrasi PM2.5 dan PM10 di 3 Stasiun pada Tahun 2015')
-    st.pyplot(plt.gcf())
+    tampilkan_figure('army1_pm_stasiun', versi, plot_pm_stasiun)
 
     #Penjelasan
     with st.expander("Lihat Penjelasan"):
@@ -395,48 +407,12 @@ def army1(df_filtered):
             - Stasiun Huairou menunjukkan konsentrasi PM10 yang cukup tinggi, tetapi masih lebih rendah dibandingkan Guanyuan. Konsentrasi PM2.5 lebih kecil, yang mungkin menunjukkan kondisi udara yang relatif lebih bersih.
             """)
 
-@st.cache_data
-def raditya1(df_filtered):
-    polutan = ['PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3']
-
-    changping_data = df_filtered[df_filtered['station'] == 'Changping'].copy()
-    correlation = changping_data[polutan].corr()
-
-    changping_data['date'] = pd.to_datetime(
-        changping_data['year'].astype(str) + '-' +
-        changping_data['month'].astype(str).str.zfill(2) + '-' +
-        changping_data['day'].astype(str).str.zfill(2) + ' ' +
-        changping_data['hour'].astype(str).str.zfill(2) + ':00'
-    )
-
-    changping_data.set_index('date', inplace=True)
-
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 7))
-
-    ax1.plot(changping_data['PM10'], label='PM10', alpha=0.7)
-    ax1.plot(changping_data['SO2'], label='SO2', alpha=0.7)
-    ax1.plot(changping_data['NO2'], label='NO2', alpha=0.7)
-    ax1.plot(changping_data['CO'], label='CO', alpha=0.7)
-    ax1.plot(changping_data['O3'], label='O3', alpha=0.7)
-    ax1.plot(changping_data['PM2.5'], label='PM2.5', alpha=0.7)
-    ax1.set_title('Tren Polutan di Stasiun Changping (Dengan CO)')
-    ax1.set_xlabel('Tanggal')
-    ax1.set_ylabel('Konsentrasi Polutan')
-    ax1.legend()
-
-
-    ax2.plot(changping_data['PM10'], label='PM10', alpha=0.7)
-    ax2.plot(changping_data['SO2'], label='SO2', alpha=0.7)
-    ax2.plot(changping_data['NO2'], label='NO2', alpha=0.7)
-    ax2.plot(changping_data['O3'], label='O3', alpha=0.7)
-    ax2.plot(changping_data['PM2.5'], label='PM2.5', alpha=0.7)
-    ax2.set_title('Tren Polutan di Stasiun Changping (Tanpa CO)')
-    ax2.set_xlabel('Tanggal')
-    ax2.set_ylabel('Konsentrasi Polutan')
-    ax2.legend()
-
-    plt.tight_layout()
-    st.pyplot(plt.gcf())
+@diukur()
+def raditya1(cube, waktu_awal, stations, versi):
+    def plot_tren_changping():
+        return grafik.figure_tren_stasiun(cube, waktu_awal, stations, 'Changping', '2014-01-01 00:00', '2016-12-31 23:00')
+
+    tampilkan_figure('raditya1_tren_changping', versi, plot_tren_changping)
 
     # Penjelasan
     with st.expander("Lihat Penjelasan"):
@@ -451,16 +427,64 @@ def raditya1(df_filtered):
             """
         )
 
-# Labeling dataframe
-df_cleaned = cleaning_data(df)
-df_label = labeling_udara(df_cleaned)
+    # Perbesar grafik untuk stasiun dan rentang tanggal lain, rentang yang pendek tampil dengan resolusi asli per jam
+    with st.expander("Perbesar Grafik"):
+        station = st.selectbox("Pilih Station:", stations, index=stations.index('Changping'), key='raditya1_station')
+        mulai, selesai = st.slider(
+            "Rentang Tanggal:",
+            min_value=datetime.date(2014, 1, 1),
+            max_value=datetime.date(2016, 12, 31),
+            value=(datetime.date(2014, 1, 1), datetime.date(2014, 1, 31)),
+            key='raditya1_rentang',
+        )
+
+        def plot_tren_zoom():
+            return grafik.figure_tren_stasiun(cube, waktu_awal, stations, station, mulai, pd.Timestamp(selesai) + pd.Timedelta(hours=23))
+
+        tampilkan_figure(f'raditya1_tren_{station}_{mulai}_{selesai}', versi, plot_tren_zoom, simpan_disk=False)
+
+# Instrumentasi: setiap eksekusi script adalah satu run, tahap pipeline dan render halaman dicatat per run
+run = instrumentasi.run_baru()
+
+signature = signature_dataset(folder_path)
+partisi_path, stat_station = siapkan_dataset(folder_path, signature)
+
+# Cleaning dan labeling dataframe, lalu tambahkan data baru dari folder stream_path (jika ada)
+stream = data_stream(signature, partisi_path, stat_station)
+cek_data_masuk(stream)
+
+# Ambil semua data dari state stream sekaligus agar konsisten selama satu kali render
+with stream['lock']:
+    df_label, df_index = stream['df_label'], stream['df_index']
+    df_filtered, rollups = stream['df_filtered'], stream['rollups']
+    cube, waktu_awal, stations_cube = stream['cube'], stream['waktu_awal'], stream['stations']
+    versi_jam = stream['versi_jam']
+    # versi hasil analisis dan grafik: nama folder hasil cleaning (dari signature dataset, versi_skema dan versi_imputasi)
+    versi_analisis = (os.path.basename(partisi_path), stream['versi_analisis'])
 
 with st.sidebar :
     selected = option_menu('Menu',['Dashboard', 'Hasil Analisis', 'Prediksi Kualitas Udara', 'Profile'],
     icons =["easel2", "graph-up", "cloud", "person"],
     menu_icon="check-circle",
     default_index=0)
-    
+
+    if stream['jumlah_baris'] > 0:
+        st.caption(f"Data baru: {stream['jumlah_baris']} baris (versi {stream['versi']})")
+
+    # Penggunaan memori data per jam dengan skema ringkas dibanding skema awal
+    with st.expander("Penggunaan Memori"):
+        laporan = laporan_memori(df_label, (signature, stream['versi']))
+        st.dataframe((laporan / 2**20).round(2).rename(columns={'sebelum': 'sebelum (MB)', 'sesudah': 'sesudah (MB)'}))
+        st.caption(f"{laporan.at['total', 'sebelum'] / laporan.at['total', 'sesudah']:.1f}x lebih kecil")
+
+    # Nilai kosong yang diisi saat cleaning: gap pendek diinterpolasi, gap panjang diisi rata-rata musiman
+    with st.expander("Imputasi Data Kosong"):
+        imputasi = ringkasan_imputasi(df_label, (signature, stream['versi']))
+        st.dataframe(imputasi.loc['semua stasiun'].unstack(0).rename(columns={'interpolasi': 'interpolasi (%)', 'musiman': 'musiman (%)'}))
+        st.caption(f"Gap sampai {ku.batas_gap_pendek} jam diinterpolasi, gap yang lebih panjang diisi rata-rata bulan x jam stasiun")
+
+tahap_halaman = instrumentasi.mulai_tahap(f"halaman:{selected}")
+
 if (selected == 'Dashboard') :
     st.header(f"Kualitas Udara Pada Station di China")
 
@@ -477,54 +501,99 @@ if (selected == 'Dashboard') :
     st.write("- **Merah Gelap**: Berbahaya")
 
     with col2:
+        # Pilih mode peta: satu jam tertentu atau animasi beberapa jam
+        mode_peta = st.radio("Mode Peta:", ["Per Jam", "Animasi"], horizontal=True)
+
+    if mode_peta == 'Per Jam':
+        with col2:
+            # Episode polusi dari index (tanpa memindai data ulang), tombol memindahkan peta ke jam puncak episode
+            with st.expander("Episode Polusi"):
+                kategori = st.selectbox("Kategori Minimal:", ku.kategori_episode, index=len(ku.kategori_episode) - 1)
+                durasi_min = st.number_input("Durasi Minimal (jam):", min_value=1, value=12)
+                episode = ku.cari_episode(index_episode(cube, waktu_awal, stations_cube, (signature, stream['versi'])), kategori, durasi_min)
+                st.caption(f"{len(episode)} episode PM2.5, diurutkan dari yang terpanjang")
+
+                if len(episode) > 0:
+                    nomor = st.selectbox(
+                        "Pilih Episode:", range(min(len(episode), 100)),
+                        format_func=lambda i: f"{episode['station'].iat[i]}, {episode['mulai'].iat[i]:%Y-%m-%d %H:00} ({episode['durasi'].iat[i]} jam)",
+                    )
+                    st.button("Tampilkan di Peta", on_click=lompat_episode, args=(episode.iloc[nomor],))
+
+            # Dropdown untuk memilih Station
+            stations = ['Pilih Semua'] + df_label["station"].cat.categories.tolist()
+            selected_station = st.selectbox("Pilih Station:", stations, key='dashboard_station')
+
+            # Dropdown untuk memilih Tahun
+            years = list(df_index)
+            selected_year = st.selectbox("Pilih Tahun:", years, key='dashboard_year')
+
+            # Dropdown untuk memilih Bulan
+            months = list(df_index[selected_year])
+            selected_month = st.selectbox("Pilih Bulan:", months, key='dashboard_month')
+
+            # Dropdown untuk memilih Hari
+            days = list(df_index[selected_year][selected_month])
+            selected_day = st.selectbox("Pilih Hari:", days, key='dashboard_day')
+
+            # Dropdown untuk memilih Jam
+            hours = list(df_index[selected_year][selected_month][selected_day])
+            selected_hour = st.selectbox("Pilih Jam:", hours, key='dashboard_hour')
+
+        with col1:
+            # Ambil blok baris untuk jam yang dipilih, lalu filter berdasarkan pilihan station
+            filtered_df = ku.filter_jam(
+                df_label, df_index, selected_year, selected_month, selected_day, selected_hour,
+                None if selected_station == 'Pilih Semua' else selected_station,
+            )
 
-        # Dropdown untuk memilih Station
-        stations = ['Pilih Semua'] + df_label["station"].unique().tolist()
-        selected_station = st.selectbox("Pilih Station:", stations)
-
-        # Dropdown untuk memilih Tahun
-        years = df_label["year"].unique()
-        selected_year = st.selectbox("Pilih Tahun:", years)
-
-        # Dropdown untuk memilih Bulan
-        months = df_label[df_label["year"] == selected_year]["month"].unique()
-        selected_month = st.selectbox("Pilih Bulan:", months)
-
-        # Dropdown untuk memilih Hari
-        days = df_label[(df_label["year"] == selected_year) & (df_label["month"] == selected_month)]["day"].unique()
-        selected_day = st.selectbox("Pilih Hari:", days)
-
-        # Dropdown untuk memilih Jam
-        hours = df_label[(df_label["year"] == selected_year) & 
-                        (df_label["month"] == selected_month) & 
-                        (df_label["day"] == selected_day)]["hour"].unique()
-        selected_hour = st.selectbox("Pilih Jam:", hours)
-
-    with col1:
-        # Filter data berdasarkan pilihan
-        if selected_station == 'Pilih Semua':
-            filtered_df = df_label[
-                (df_label["year"] == selected_year) &
-                (df_label["month"] == selected_month) &
-                (df_label["day"] == selected_day) &
-                (df_label["hour"] == selected_hour)
-            ]
-        else:
-            filtered_df = df_label[
-                (df_label["station"] == selected_station) &
-                (df_label["year"] == selected_year) &
-                (df_label["month"] == selected_month) &
-                (df_label["day"] == selected_day) &
-                (df_label["hour"] == selected_hour)
-            ]
-
-        # Buat peta jika ada data yang terpilih
-        if len(filtered_df) > 0:
-            map_china = create_map(filtered_df)
-            # Tampilkan peta di Streamlit
-            st_folium(map_china, width=725, height=500)
-        else:
-            st.write("Data tidak ditemukan untuk kombinasi yang dipilih.")
+            # Buat peta jika ada data yang terpilih (key memakai versi jam tersebut, sehingga hanya jam yang berubah yang dibuat ulang)
+            if len(filtered_df) > 0:
+                koordinat = koordinat_station.reindex(filtered_df["station"].astype(str))
+                jam_terpilih = (pd.Timestamp(selected_year, selected_month, selected_day, selected_hour) - waktu_awal) // pd.Timedelta(hours=1)
+                map_china = create_map(
+                    (signature, int(versi_jam[jam_terpilih]), selected_year, selected_month, selected_day, selected_hour, selected_station),
+                    koordinat["lat"].to_numpy(), koordinat["lon"].to_numpy(),
+                    filtered_df["label"].cat.codes.to_numpy(), filtered_df["PM2.5"].to_numpy(),
+                    filtered_df["station"].astype(str).tolist(),
+                )
+                # Tampilkan peta di Streamlit
+                st_folium(map_china, width=725, height=500)
+
+                # Keterangan episode jika peta sedang menampilkan jam puncak episode yang dipilih
+                episode_terpilih = st.session_state.get('episode_terpilih')
+                if episode_terpilih is not None and episode_terpilih['waktu_puncak'] == pd.Timestamp(selected_year, selected_month, selected_day, selected_hour):
+                    st.caption(
+                        f"Episode {episode_terpilih['station']}: {episode_terpilih['mulai']:%Y-%m-%d %H:00} - "
+                        f"{episode_terpilih['selesai']:%Y-%m-%d %H:00} ({episode_terpilih['durasi']} jam), "
+                        f"puncak PM2.5 {episode_terpilih['puncak']:.0f} pada jam ini"
+                    )
+            else:
+                st.write("Data tidak ditemukan untuk kombinasi yang dipilih.")
+
+    else:
+        with col2:
+            polutan_animasi = st.selectbox("Pilih Polutan:", list(breakpoint_aqi))
+            periode = st.selectbox("Pilih Periode:", list(periode_animasi))
+            tanggal_mulai = st.date_input(
+                "Tanggal Mulai:",
+                value=waktu_awal.date(),
+                min_value=waktu_awal.date(),
+                max_value=(waktu_awal + pd.Timedelta(hours=cube.shape[1] - 1)).date(),
+            )
+
+        with col1:
+            # Slice cube untuk rentang jam yang dipilih, tanpa melalui pandas
+            jam_mulai = int((pd.Timestamp(tanggal_mulai) - waktu_awal) // pd.Timedelta(hours=1))
+            jam_selesai = min(jam_mulai + periode_animasi[periode], cube.shape[1])
+            nilai = cube[:, jam_mulai:jam_selesai, polutan_cube.index(polutan_animasi)]
+
+            map_animasi = create_animated_map(
+                (signature, int(versi_jam[jam_mulai:jam_selesai].max(initial=0)), polutan_animasi, jam_mulai, jam_selesai),
+                nilai, stations_cube,
+                waktu_awal + pd.Timedelta(hours=jam_mulai), polutan_animasi,
+            )
+            st_folium(map_animasi, width=725, height=500, returned_objects=[])
 
 elif (selected == 'Hasil Analisis') :
     st.header(f"Hasil Analisis Kualitas Udara")
@@ -542,10 +611,10 @@ elif (selected == 'Hasil Analisis') :
         soal1,soal2 = st.tabs(["Soal 1", "Soal 2"])
         with soal1 :
             st.subheader("Soal 1")
-            ratu1(df_filtered)
+            ratu1(rollups, versi_analisis)
         with soal2 :
             st.subheader("Soal 2")
-            ratu2(df_filtered)
+            ratu2(df_filtered, versi_analisis)
         
     with tab2 :
         st.markdown("**Nama : SALSABILA**")
@@ -557,7 +626,7 @@ elif (selected == 'Hasil Analisis') :
         st.write('')
 
         st.subheader("Soal 1")
-        salsa1(df_filtered)
+        salsa1(rollups, versi_analisis)
 
     with tab3 :
         st.markdown("**Nama : RAFLY RAYHANSYAH**")
@@ -573,10 +642,10 @@ elif (selected == 'Hasil Analisis') :
 
         with soal1 :
             st.subheader("Soal 1")
-            rafly1(df_filtered)
+            rafly1(rollups, versi_analisis)
         with soal2 :
             st.subheader("Soal 2")
-            rafly2(df_filtered)
+            rafly2(rollups, versi_analisis)
             
     with tab4 :
         st.markdown("**Nama : ARMY HANIF HABIBIE**")
@@ -588,7 +657,7 @@ elif (selected == 'Hasil Analisis') :
         st.write('')
 
         st.subheader("Soal 1")
-        army1(df_filtered)
+        army1(rollups, versi_analisis)
 
     with tab5 :
         st.markdown("**Nama : RADITYA RESKYANANTA SAPUTRA**")
@@ -600,12 +669,17 @@ elif (selected == 'Hasil Analisis') :
         st.write('')
 
         st.subheader("Soal 1")
-        raditya1(df_filtered)
+        raditya1(cube, waktu_awal, stations_cube, versi_analisis)
 
 elif (selected == 'Prediksi Kualitas Udara') :
-    st.header("Prediksi Kualitas Udara untuk 1 Jam ke Depan")
+    st.header("Prediksi Kualitas Udara")
     # Memuat model
-    model = tf.keras.models.load_model('model_prediksi.h5', custom_objects={'mse': 'mean_squared_error'})
+    model, info_model = load_model(model_path)
+    scaler = load_scaler(scaler_path)
+    st.caption(f"Model dimuat dalam {info_model['waktu_load']:.2f} detik, inferensi pertama {info_model['waktu_inferensi_pertama']:.2f} detik")
+
+    # Jumlah jam yang diprediksi ke depan
+    horizon = st.selectbox("Prediksi untuk (jam ke depan):", [1, 6, 24, 72])
 
     # untuk upload file yang bertipe csv
     file = st.file_uploader('Unggah File', type='csv')
@@ -615,35 +689,52 @@ elif (selected == 'Prediksi Kualitas Udara') :
         df_model = pd.read_csv(file)
 
         # Pastikan hanya mengambil kolom fitur yang digunakan dalam model
-        selected_features = ['PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3']  # Sesuaikan dengan fitur model Anda
         df_model = df_model[selected_features]
 
-        # Lakukan normalisasi dengan MinMaxScaler
-        scaler = MinMaxScaler()
-        val_scaled = scaler.fit_transform(df_model)  # Normalisasi data
-
-        # Ambil 24 jam terakhir
-        last_24_hours = val_scaled[-24:].reshape(1, 24, val_scaled.shape[1])  # Sesuai shape model
+        if len(df_model) < n_input:
+            st.warning(f'File CSV harus memiliki minimal {n_input} baris data (1 baris per jam)')
 
-        # Prediksi kadar polutan 1 jam ke depan
-        predicted_pollution = model.predict(last_24_hours)
-
-        # Inverse transform untuk mendapatkan nilai asli
-        predicted_pollution = scaler.inverse_transform(predicted_pollution)
+        else:
+            # Prediksi kadar polutan beberapa jam ke depan dari 24 jam terakhir
+            # (normalisasi memakai parameter scaler saat training)
+            predicted_pollution, latensi = prediksi_rekursif(model, scaler, df_model.to_numpy()[-n_input:], horizon)
 
-        # Buat DataFrame hasil prediksi
-        df_predicted = pd.DataFrame(predicted_pollution, columns=selected_features)
+            # Buat DataFrame hasil prediksi
+            df_predicted = pd.DataFrame(predicted_pollution[0], columns=selected_features)
+            df_predicted.insert(0, "Jam ke", np.arange(1, horizon + 1))
 
-        # Tambahkan kolom "Status PM2.5"
-        df_predicted["Status"] = df_predicted["PM2.5"].apply(label_pm25)
+            # Tambahkan kolom "Status PM2.5"
+            df_predicted["Status"] = label_kualitas_udara(df_predicted["PM2.5"])
 
-        # Tampilkan hasil prediksi
-        st.write("Hasil Prediksi Kadar Polutan (1 Jam ke Depan):")
-        st.write(df_predicted)
+            # Tampilkan hasil prediksi
+            st.write(f"Hasil Prediksi Kadar Polutan ({horizon} Jam ke Depan):")
+            st.caption(f"Latensi per langkah: rata-rata {np.mean(latensi) * 1000:.1f} ms, maksimum {np.max(latensi) * 1000:.1f} ms")
+            st.write(df_predicted)
 
     else:
         st.warning('Harap unggah file CSV dari Github terlebih dahulu! Pastikan file CSV yang diunggah memiliki format yang benar')
 
+    # Prediksi historis: setiap jam pada hari yang dipilih untuk banyak stasiun sekaligus
+    st.subheader("Prediksi Historis per Stasiun")
+    with st.form("prediksi_historis"):
+        station_pilihan = st.multiselect("Pilih Station:", stations_cube, default=stations_cube)
+        tanggal_prediksi = st.date_input(
+            "Tanggal:",
+            value=datetime.date(2016, 12, 31),
+            min_value=(waktu_awal + pd.Timedelta(hours=n_input)).date(),
+            max_value=(waktu_awal + pd.Timedelta(hours=cube.shape[1] - 1)).date(),
+        )
+        batch_size = st.number_input("Batch Size:", min_value=1, max_value=4096, value=256)
+        jalankan = st.form_submit_button("Jalankan Prediksi")
+
+    if jalankan and station_pilihan:
+        mulai = pd.Timestamp(tanggal_prediksi)
+        deret = deret_prediksi(cube, waktu_awal, stations_cube, station_pilihan, mulai, mulai + pd.Timedelta(hours=23))
+
+        df_historis = prediksi_batch(model, scaler, deret, batch_size=int(batch_size))
+        st.write(df_historis)
+        st.download_button("Unduh CSV", df_historis.to_csv(index=False), file_name=f"prediksi_{tanggal_prediksi}.csv", mime="text/csv")
+
 elif (selected == 'Profile') :
     # Data anggota (NIM, Nama, Foto)
     anggota = [
@@ -683,4 +774,19 @@ elif (selected == 'Profile') :
     # 🔹 **Baris kedua (2 anggota, rata tengah)**
     cols2 = st.columns([1, 3, 3, 1])  # 1 kolom kosong di kiri & kanan agar center
     for col, (nim, nama, foto) in zip(cols2[1:3], anggota[3:]):  # Ambil index ke-1 dan ke-2
-        display_member(col, nim, nama, foto)
\ No newline at end of file
+        display_member(col, nim, nama, foto)
+
+instrumentasi.selesai_tahap(tahap_halaman)
+
+# Panel diagnostik tersembunyi, tampil jika URL diberi ?diagnostik=1: waktu, memori dan cache setiap tahap pada run ini
+if st.query_params.get("diagnostik") == "1":
+    with st.sidebar.expander("Diagnostik", expanded=True):
+        df_diagnostik = pd.DataFrame(instrumentasi.catatan_run(run))
+        st.dataframe(df_diagnostik[['tahap', 'induk', 'cache', 'detik', 'rss_naik_mb', 'rss_mb']], hide_index=True)
+        rss, peak = instrumentasi.rss(), instrumentasi.peak_rss()
+        if rss is not None and peak is not None:
+            st.caption(f"Memori proses {rss / 2**20:.0f} MB, puncak {peak / 2**20:.0f} MB")
+        st.download_button(
+            "Unduh JSON Lines", instrumentasi.json_lines(instrumentasi.catatan),
+            file_name="instrumentasi.jsonl", mime="application/jsonl",
+        )
@@ -0,0 +1,112 @@
+# Jalankan seluruh pipeline analisis tanpa streamlit (misalnya untuk job malam hari):
+# load dan cleaning folder dataset, hitung semua analisis, lalu tulis tabel (CSV) dan grafik ke folder output
+# contoh: python batch_analisis.py --dataset Dataset --output hasil --format svg
+import os
+import argparse
+import time
+import pandas as pd
+
+import kualitas_udara as ku
+import instrumentasi
+
+def tulis_csv(output_path, nama, data, index=True):
+    data.to_csv(os.path.join(output_path, f"{nama}.csv"), index=index)
+    print(f"  {nama}.csv")
+
+def tulis_figure(output_path, nama, fig, format):
+    import matplotlib.pyplot as plt
+    fig.savefig(os.path.join(output_path, f"{nama}.{format}"), format=format, bbox_inches='tight')
+    plt.close(fig)
+    print(f"  {nama}.{format}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisis kualitas udara tanpa streamlit")
+    parser.add_argument("--dataset", default=ku.folder_path, help="folder file CSV PRSA (default: %(default)s)")
+    parser.add_argument("--output", default="hasil_analisis", help="folder hasil tabel dan grafik (default: %(default)s)")
+    parser.add_argument("--cache", default=None, help="folder cache parquet (default: <dataset>/.cache)")
+    parser.add_argument("--workers", type=int, default=ku.n_worker, help="jumlah worker paralel (default: %(default)s)")
+    parser.add_argument("--format", default="png", choices=["png", "svg", "pdf"], help="format grafik (default: %(default)s)")
+    parser.add_argument("--tanpa-grafik", action="store_true", help="hanya tulis tabel CSV")
+    parser.add_argument("--log", default=instrumentasi.log_path, help="file JSON lines waktu dan memori setiap tahap (default: env INSTRUMENTASI_LOG)")
+    args = parser.parse_args()
+
+    instrumentasi.log_path = args.log
+    instrumentasi.run_baru()
+
+    os.makedirs(args.output, exist_ok=True)
+    mulai = time.perf_counter()
+
+    # Load, cleaning dan rollup (memakai cache parquet yang sama dengan aplikasi streamlit)
+    signature = ku.signature_dataset(args.dataset)
+    partisi_path, _ = ku.siapkan_dataset(args.dataset, signature, args.cache, n_worker=args.workers)
+    df_cleaned, df_filtered = ku.cleaning_data(partisi_path)
+    rollups = ku.rollup_data(partisi_path, n_worker=args.workers)
+    print(f"Dataset: {len(signature)} file, {len(df_cleaned)} baris ({time.perf_counter() - mulai:.1f} detik)")
+
+    # Tabel rata-rata rollup
+    print("Tabel:")
+    for nama, rollup in rollups.items():
+        tulis_csv(args.output, f"rollup_{nama}", ku.rata_rata(rollup))
+
+    # Persentase nilai yang diisi interpolasi dan rata-rata musiman per stasiun
+    tulis_csv(args.output, "imputasi_gap", ku.ringkasan_imputasi(df_cleaned))
+
+    # Hasil setiap analisis
+    df_polluted_summary, df_heatmap = ku.hitung_ratu1(rollups)
+    tulis_csv(args.output, "ratu1_jumlah_hari", df_polluted_summary, index=False)
+    tulis_csv(args.output, "ratu1_distribusi", df_heatmap)
+
+    rush_avg, off_peak_avg = ku.hitung_salsa1(rollups)
+    tulis_csv(args.output, "salsa1_jam_sibuk", rush_avg.to_frame('jam_sibuk').assign(jam_tidak_sibuk=off_peak_avg))
+
+    pm10_per_bulan = ku.hitung_rafly1(rollups)
+    tulis_csv(args.output, "rafly1_pm10_bulanan", pm10_per_bulan)
+
+    avg_o3_pagi, avg_o3_sore = ku.hitung_rafly2(rollups)
+    tulis_csv(args.output, "rafly2_o3_pagi_sore", pd.Series({'pagi': avg_o3_pagi, 'sore': avg_o3_sore}, name='O3'))
+
+    filter_data = ku.hitung_army1(rollups)
+    tulis_csv(args.output, "army1_pm_stasiun", filter_data, index=False)
+
+    # Korelasi spearman: seluruh data, per stasiun dan per stasiun per bulan
+    corr_factors = ku.hitung_ratu2(df_filtered)
+    tulis_csv(args.output, "ratu2_korelasi", corr_factors)
+    tulis_csv(args.output, "korelasi_per_stasiun", ku.korelasi_spearman(df_filtered, ('station',)))
+    tulis_csv(args.output, "korelasi_bulanan", ku.korelasi_spearman(df_filtered, ('station', 'year', 'month')))
+
+    # Wind rose, polutan per arah angin dan arah sumber PM2.5 per stasiun
+    tabel_arah, sumber_arah = ku.analisis_arah_angin(df_filtered)
+    tulis_csv(args.output, "arah_angin", tabel_arah)
+    tulis_csv(args.output, "arah_sumber", sumber_arah)
+
+    # Episode polusi PM2.5 per kategori dari cube data per jam (seluruh tahun)
+    cube, waktu_awal, stations = ku.cube_polutan(ku.labeling_udara(df_cleaned))
+    index = ku.index_episode(cube, waktu_awal, stations)
+    tulis_csv(args.output, "episode_polusi", pd.concat(index, names=['kategori', 'nomor']).drop(columns='jam_mulai'))
+
+    if not args.tanpa_grafik:
+        # matplotlib tanpa tampilan, di-import hanya jika grafik dibuat
+        import matplotlib
+        matplotlib.use('Agg')
+        import grafik_udara as grafik
+
+        print("Grafik:")
+        tulis_figure(args.output, "ratu1_jumlah_hari", grafik.plot_jumlah_hari(df_polluted_summary), args.format)
+        tulis_figure(args.output, "ratu1_distribusi", grafik.plot_distribusi(df_heatmap), args.format)
+        tulis_figure(args.output, "ratu2_korelasi", grafik.plot_korelasi(corr_factors), args.format)
+        tulis_figure(args.output, "salsa1_jam_sibuk", grafik.plot_jam_sibuk(rush_avg, off_peak_avg), args.format)
+        tulis_figure(args.output, "rafly1_pm10_bulanan", grafik.plot_pm10_bulanan(pm10_per_bulan), args.format)
+        tulis_figure(args.output, "rafly2_o3_pagi_sore", grafik.plot_o3_pagi_sore(avg_o3_pagi, avg_o3_sore), args.format)
+        tulis_figure(args.output, "army1_pm_stasiun", grafik.plot_pm_stasiun(filter_data), args.format)
+        for station in sumber_arah.index:
+            tulis_figure(args.output, f"wind_rose_{station}", grafik.plot_wind_rose(tabel_arah, sumber_arah, station), args.format)
+
+        # Tren polutan stasiun Changping dari cube data per jam
+        tulis_figure(args.output, "raditya1_tren_changping", grafik.figure_tren_stasiun(
+            cube, waktu_awal, stations, 'Changping', '2014-01-01 00:00', '2016-12-31 23:00',
+        ), args.format)
+
+    print(f"Selesai dalam {time.perf_counter() - mulai:.1f} detik, hasil di {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# Benchmark tahapan pipeline: load CSV -> cleaning -> labeling -> filter Dashboard dan episode -> analisis -> peta -> prediksi
+# setiap tahap diukur beberapa kali (min dan median detik), hasilnya ditambahkan sebagai satu baris JSON per run
+# dengan commit git saat itu, lalu dibandingkan dengan run terakhir dari commit lain pada dataset yang sama
+# (file hasil berisi waktu di mesin ini saja, tidak ikut di-commit: benchmark_hasil.jsonl ada di .gitignore)
+# contoh:
+#   python benchmark.py                             (dataset asli di folder Dataset)
+#   python benchmark.py --sintetis 24 8             (data sintetis 24 stasiun x 8 tahun)
+#   python benchmark.py --tahap analisis peta       (hanya tahap tertentu)
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import numpy as np
+import pandas as pd
+
+import kualitas_udara as ku
+
+tahap_benchmark = ['load', 'cleaning', 'labeling', 'filter', 'analisis', 'peta', 'prediksi']
+
+# Rata-rata dan sebaran kasar setiap kolom pada dataset PRSA, dipakai untuk membuat data sintetis
+profil_polutan = {'PM2.5': 80, 'PM10': 105, 'SO2': 16, 'NO2': 50, 'CO': 1200, 'O3': 57}
+
+# Buat dataset sintetis berskema PRSA: n_station stasiun x n_tahun tahun data per jam mulai 1 Maret 2013
+# satu file CSV per stasiun; 12 stasiun pertama memakai nama stasiun asli, berikutnya nama asli + nomor
+# sekitar 2% nilai pengukuran dan 0.5% arah angin dikosongkan seperti data asli
+def buat_dataset_sintetis(folder, n_station, n_tahun, seed=0):
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    waktu = pd.date_range('2013-03-01', pd.Timestamp('2013-03-01') + pd.DateOffset(years=n_tahun), freq='h', inclusive='left')
+    n = len(waktu)
+    musim = np.cos(2 * np.pi * (waktu.dayofyear.to_numpy() - 200) / 365)
+    stations = list(ku.stations_coordinates)
+
+    for i in range(n_station):
+        station = stations[i % len(stations)] + (f"_{i // len(stations)}" if i >= len(stations) else "")
+        temp = 13 + 14 * musim + rng.normal(0, 3, n)
+        df = pd.DataFrame({
+            'No': np.arange(1, n + 1),
+            'year': waktu.year, 'month': waktu.month, 'day': waktu.day, 'hour': waktu.hour,
+            **{polutan: np.round(rng.lognormal(np.log(rata), 0.8, n), 1) for polutan, rata in profil_polutan.items()},
+            'TEMP': np.round(temp, 1),
+            'PRES': np.round(1010 - 10 * musim + rng.normal(0, 4, n), 1),
+            'DEWP': np.round(temp - 10 + rng.normal(0, 4, n), 1),
+            'RAIN': np.round(np.where(rng.random(n) < 0.04, rng.exponential(2, n), 0), 1),
+            'wd': rng.choice(ku.arah_angin, n),
+            'WSPM': np.round(rng.gamma(2, 0.9, n), 1),
+            'station': station,
+        })
+        for kolom in ku.kolom_rollup:
+            df.loc[rng.random(n) < 0.02, kolom] = np.nan
+        df.loc[rng.random(n) < 0.005, 'wd'] = np.nan
+        df.to_csv(os.path.join(folder, f"PRSA_Data_{station}_sintetis.csv"), index=False)
+
+# Jalankan fungsi sebanyak repeat kali, catat waktu setiap run pada hasil[nama] dan kembalikan hasil run terakhir
+# per_item membagi waktu dengan banyak item (misalnya waktu per query)
+def ukur(hasil, nama, fungsi, repeat, per_item=1):
+    waktu = []
+    for _ in range(repeat):
+        mulai = time.perf_counter()
+        keluaran = fungsi()
+        waktu.append((time.perf_counter() - mulai) / per_item)
+    hasil[nama] = {'min': min(waktu), 'median': statistics.median(waktu), 'repeat': repeat}
+    print(f"  {nama:<28} min {min(waktu):10.4f} s   median {statistics.median(waktu):10.4f} s")
+    return keluaran
+
+# Commit git saat ini dan apakah ada perubahan yang belum di-commit (file yang belum dilacak diabaikan)
+def info_git():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True, check=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+# Bandingkan dengan run terakhir dari commit lain pada dataset yang sama, tahap yang lebih lambat dari ambang ditandai
+def bandingkan(record, hasil_path, ambang):
+    sebelumnya = None
+    if os.path.exists(hasil_path):
+        with open(hasil_path) as f:
+            for baris in f:
+                r = json.loads(baris)
+                if r['dataset'] == record['dataset'] and r['commit'] != record['commit']:
+                    sebelumnya = r
+    if sebelumnya is None:
+        return
+
+    print(f"\nDibandingkan dengan commit {(sebelumnya['commit'] or '-')[:10]} ({sebelumnya['waktu']}):")
+    for nama, h in record['hasil'].items():
+        if nama in sebelumnya['hasil']:
+            rasio = h['median'] / sebelumnya['hasil'][nama]['median']
+            tanda = "  <- lebih lambat" if rasio > ambang else ""
+            print(f"  {nama:<28} {rasio:6.2f}x{tanda}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline kualitas udara")
+    parser.add_argument("--dataset", default=ku.folder_path, help="folder file CSV PRSA (default: %(default)s)")
+    parser.add_argument("--sintetis", nargs=2, type=int, metavar=("N_STATION", "N_TAHUN"),
+                        help="pakai data sintetis N_STATION stasiun x N_TAHUN tahun (minimal 12 x 4, sesuai stasiun dan tahun pada analisis)")
+    parser.add_argument("--tahap", nargs="+", default=tahap_benchmark, choices=tahap_benchmark, help="tahap yang diukur (default: semua)")
+    parser.add_argument("--repeat", type=int, default=3, help="banyak pengulangan setiap tahap (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=ku.n_worker, help="jumlah worker paralel (default: %(default)s)")
+    parser.add_argument("--hasil", default="benchmark_hasil.jsonl", help="file JSON lines hasil benchmark (default: %(default)s)")
+    parser.add_argument("--ambang", type=float, default=1.2, help="rasio waktu yang dianggap regresi (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.sintetis and (args.sintetis[0] < 12 or args.sintetis[1] < 4):
+        parser.error("--sintetis minimal 12 stasiun x 4 tahun")
+
+    # Semua cache (parquet, data sintetis) ditulis ke folder sementara agar setiap run dimulai dari kondisi yang sama
+    tmp_path = tempfile.mkdtemp(prefix="benchmark_udara_")
+    try:
+        dataset_path = args.dataset
+        if args.sintetis:
+            dataset_path = os.path.join(tmp_path, "dataset")
+            mulai = time.perf_counter()
+            buat_dataset_sintetis(dataset_path, *args.sintetis)
+            print(f"Data sintetis {args.sintetis[0]} stasiun x {args.sintetis[1]} tahun dibuat dalam {time.perf_counter() - mulai:.1f} detik")
+
+        hasil = {}
+        tahap = set(args.tahap)
+        signature = ku.signature_dataset(dataset_path)
+        cache_path = os.path.join(tmp_path, "cache")
+        print("Tahap:")
+
+        # Load dan cleaning CSV ke cache parquet: dingin (cache kosong) dan hangat (cache sudah ada)
+        def load_dingin():
+            shutil.rmtree(cache_path, ignore_errors=True)
+            return ku.siapkan_dataset(dataset_path, signature, cache_path, n_worker=args.workers)
+
+        if 'load' in tahap:
+            ukur(hasil, 'load_csv_dingin', load_dingin, args.repeat)
+            partisi_path, _ = ukur(hasil, 'load_csv_hangat', lambda: ku.siapkan_dataset(dataset_path, signature, cache_path, n_worker=args.workers), args.repeat)
+        else:
+            partisi_path, _ = ku.siapkan_dataset(dataset_path, signature, cache_path, n_worker=args.workers)
+
+        if 'cleaning' in tahap:
+            df_cleaned, df_filtered = ukur(hasil, 'cleaning_data', lambda: ku.cleaning_data(partisi_path), args.repeat)
+        else:
+            df_cleaned, df_filtered = ku.cleaning_data(partisi_path)
+
+        if 'labeling' in tahap:
+            df_label = ukur(hasil, 'labeling_udara', lambda: ku.labeling_udara(df_cleaned), args.repeat)
+            df_index = ukur(hasil, 'index_waktu', lambda: ku.index_waktu(df_label), args.repeat)
+        else:
+            df_label = ku.labeling_udara(df_cleaned)
+            df_index = ku.index_waktu(df_label)
+
+        cube, waktu_awal, stations_cube = ku.cube_polutan(df_label)
+
+        # Filter Dashboard untuk 1000 jam dan stasiun acak, dicatat waktu per query
+        # serta index episode polusi dan query episode 'hazardous' >= 12 jam dari index
+        if 'filter' in tahap:
+            rng = np.random.default_rng(0)
+            jam = df_label[['year', 'month', 'day', 'hour']].drop_duplicates().to_numpy()
+            jam = jam[rng.integers(0, len(jam), 1000)].tolist()
+            stations = df_label['station'].cat.categories.tolist() + [None]
+            pilihan = [stations[i] for i in rng.integers(0, len(stations), len(jam))]
+
+            def filter_dashboard():
+                for (year, month, day, hour), station in zip(jam, pilihan):
+                    ku.filter_jam(df_label, df_index, year, month, day, hour, station)
+
+            ukur(hasil, 'filter_dashboard (per query)', filter_dashboard, args.repeat, per_item=len(jam))
+
+            index = ukur(hasil, 'index_episode', lambda: ku.index_episode(cube, waktu_awal, stations_cube), args.repeat)
+            ukur(hasil, 'cari_episode (per query)', lambda: ku.cari_episode(index, 'hazardous', 12), args.repeat)
+
+        # Perhitungan setiap analisis
+        if 'analisis' in tahap:
+            rollups = ukur(hasil, 'rollup_data', lambda: ku.rollup_data(partisi_path, n_worker=args.workers), args.repeat)
+            ukur(hasil, 'hitung_ratu1', lambda: ku.hitung_ratu1(rollups), args.repeat)
+            ukur(hasil, 'hitung_ratu2', lambda: ku.hitung_ratu2(df_filtered), args.repeat)
+            ukur(hasil, 'hitung_salsa1', lambda: ku.hitung_salsa1(rollups), args.repeat)
+            ukur(hasil, 'hitung_rafly1', lambda: ku.hitung_rafly1(rollups), args.repeat)
+            ukur(hasil, 'hitung_rafly2', lambda: ku.hitung_rafly2(rollups), args.repeat)
+            ukur(hasil, 'hitung_army1', lambda: ku.hitung_army1(rollups), args.repeat)
+            ukur(hasil, 'korelasi_per_stasiun', lambda: ku.korelasi_spearman(df_filtered, ('station',)), args.repeat)
+            ukur(hasil, 'korelasi_bulanan', lambda: ku.korelasi_spearman(df_filtered, ('station', 'year', 'month')), args.repeat)
+
+        # Peta satu jam (semua stasiun) dan peta animasi satu minggu, termasuk render ke HTML seperti pada st_folium
+        if 'peta' in tahap:
+            import peta_udara as peta
+
+            # stasiun sintetis memakai koordinat stasiun asli yang namanya dipakai
+            filtered_df = df_label.iloc[slice(*df_index[2016][1][1][8])]
+            koordinat = ku.koordinat_station.reindex(filtered_df['station'].astype(str).str.split('_').str[0])
+
+            def create_map():
+                return peta.buat_peta(
+                    koordinat['lat'].to_numpy(), koordinat['lon'].to_numpy(),
+                    filtered_df['label'].cat.codes.to_numpy(), filtered_df['PM2.5'].to_numpy(),
+                    filtered_df['station'].astype(str).tolist(),
+                ).get_root().render()
+
+            ukur(hasil, 'create_map', create_map, args.repeat)
+
+            asli = [i for i, station in enumerate(stations_cube) if station in ku.stations_coordinates]
+            jam_mulai = int((pd.Timestamp(2016, 1, 1) - waktu_awal) // pd.Timedelta(hours=1))
+            nilai = cube[asli, jam_mulai:jam_mulai + 24 * 7, 0]
+            ukur(hasil, 'create_animated_map', lambda: peta.buat_peta_animasi(
+                nilai, [stations_cube[i] for i in asli], pd.Timestamp(2016, 1, 1), 'PM2.5',
+            ).get_root().render(), args.repeat)
+
+        # Prediksi LSTM: satu window 1 jam, rekursif 24 jam, dan batch semua stasiun untuk satu hari
+        if 'prediksi' in tahap:
+            model, info_model = ku.muat_model()
+            scaler = ku.muat_scaler()
+            hasil['muat_model'] = {'min': info_model['waktu_load'], 'median': info_model['waktu_load'], 'repeat': 1}
+            hasil['inferensi_pertama'] = {'min': info_model['waktu_inferensi_pertama'], 'median': info_model['waktu_inferensi_pertama'], 'repeat': 1}
+
+            mulai = pd.Timestamp(2016, 12, 31)
+            deret = ku.deret_prediksi(cube, waktu_awal, stations_cube, stations_cube, mulai, mulai + pd.Timedelta(hours=23))
+            window = next(iter(deret.values()))[1][:ku.n_input]
+
+            ukur(hasil, 'prediksi_tunggal', lambda: ku.prediksi_rekursif(model, scaler, window, 1), args.repeat)
+            ukur(hasil, 'prediksi_rekursif_24', lambda: ku.prediksi_rekursif(model, scaler, window, 24), args.repeat)
+            ukur(hasil, 'prediksi_batch', lambda: ku.prediksi_batch(model, scaler, deret), args.repeat)
+
+        commit, dirty = info_git()
+        record = {
+            'commit': commit,
+            'dirty': dirty,
+            'waktu': pd.Timestamp.now().isoformat(timespec='seconds'),
+            'dataset': {
+                'sumber': 'sintetis' if args.sintetis else os.path.abspath(args.dataset),
+                'n_station': len(df_cleaned['station'].cat.categories),
+                'baris': len(df_cleaned),
+            },
+            'n_worker': args.workers,
+            'python': platform.python_version(),
+            'hasil': hasil,
+        }
+        bandingkan(record, args.hasil, args.ambang)
+        with open(args.hasil, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nHasil ditambahkan ke {args.hasil}")
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# Visualisasi hasil analisis kualitas udara dengan matplotlib/seaborn, tanpa streamlit
+# setiap fungsi menerima hasil perhitungan dari kualitas_udara.py dan mengembalikan figure-nya
+# dipakai oleh TubesStreamlit.py dan batch_analisis.py
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from kualitas_udara import polutan_cube, faktor_meteorologi, deret_stasiun, downsample_minmax
+
+def plot_jumlah_hari(df_polluted_summary):
+    plt.figure(figsize=(12, 6))
+    sns.barplot(
+        data=df_polluted_summary,
+        x="station",
+        y="jumlah_hari_terpolusi",
+        hue="station",
+        palette="dark:skyblue"
+    )
+
+    plt.ylim(0, df_polluted_summary["jumlah_hari_terpolusi"].max() + 200)
+
+    plt.xlabel("Stasiun")
+    plt.ylabel("Jumlah Hari Terpolusi")
+    plt.title("Jumlah Hari dengan Polusi Tinggi per Stasiun")
+    plt.xticks(rotation=45)
+    return plt.gcf()
+
+def plot_distribusi(df_heatmap):
+    plt.figure(figsize=(14, 6))
+    sns.heatmap(df_heatmap, cmap='Blues', linewidths=0.5)
+
+    plt.xlabel("Hari dalam Sebulan")
+    plt.ylabel("Stasiun")
+    plt.title("Distribusi Polusi di Setiap Stasiun")
+    return plt.gcf()
+
+def plot_korelasi(corr_factors):
+    plt.figure(figsize=(10, 6))
+    sns.heatmap(corr_factors, annot=True, cmap="Blues", fmt=".2f", linewidths=0.5)
+    plt.title("Korelasi antara Faktor Meteorologi dan Polutan")
+    return plt.gcf()
+
+# Korelasi bulanan faktor meteorologi dengan satu polutan pada satu stasiun,
+# corr_bulanan adalah hasil korelasi_spearman dengan kelompok ('station', 'year', 'month')
+def plot_korelasi_bulanan(corr_bulanan, station, polutan):
+    data = corr_bulanan.xs((station, polutan), level=('station', 'kolom'))[faktor_meteorologi]
+    bulan = pd.to_datetime(pd.DataFrame({
+        'year': data.index.get_level_values('year'), 'month': data.index.get_level_values('month'), 'day': 1,
+    }))
+
+    fig, ax = plt.subplots(figsize=(12, 5))
+    for faktor in faktor_meteorologi:
+        ax.plot(bulan, data[faktor].to_numpy(), marker='o', markersize=3, label=faktor)
+    ax.axhline(0, color='gray', linewidth=0.8)
+    ax.set_ylim(-1, 1)
+    ax.set_title(f'Korelasi Spearman Bulanan {polutan} dengan Faktor Meteorologi di Stasiun {station}')
+    ax.set_xlabel('Bulan')
+    ax.set_ylabel('Korelasi')
+    ax.legend()
+    return fig
+
+def plot_jam_sibuk(rush_avg, off_peak_avg):
+    pollutants = ['PM2.5', 'PM10', 'SO2']
+    rush_values = rush_avg.values
+    off_peak_values = off_peak_avg.values
+
+    x = range(len(pollutants))
+    plt.figure(figsize=(10, 6))
+    plt.bar(x, rush_values, width=0.4, label='Jam Sibuk', align='center')
+    plt.bar(x, off_peak_values, width=0.4, label='Jam Tidak Sibuk', align='edge')
+    plt.xlabel('polutan')
+    plt.ylabel('Rata-Rata Konsentrasi Udara')
+    plt.title('Perbandingan Kualitas Udara Selama Jam Sibuk vs Jam Tidak Sibuk')
+    plt.xticks(ticks=x, labels=pollutants)
+    plt.legend()
+    return plt.gcf()
+
+def plot_pm10_bulanan(pm10_per_bulan):
+    # Visualisasi rata-rata PM10 bulanan per tahun menggunakan seaborn lineplot
+    plt.figure(figsize=(14, 6))
+
+    for year in pm10_per_bulan.index:
+        plt.plot(pm10_per_bulan.columns, pm10_per_bulan.loc[year], label=str(year), marker='o')
+
+    plt.xlabel('Bulan', fontsize=12)
+    plt.ylabel('Rata-rata PM10', fontsize=12)
+    plt.title('Rata-rata PM10 Bulanan per Tahun (2014-2016) pada station tiantan', fontsize=14)
+    plt.xticks(rotation=45)
+    plt.grid(True)
+    plt.legend(title='Tahun')
+
+    # Menampilkan grafik
+    plt.tight_layout()
+    return plt.gcf()
+
+def plot_o3_pagi_sore(avg_o3_pagi, avg_o3_sore):
+    # Membuat bar chart perbandingan rata-rata O₃ antara pagi dan sore
+    plt.figure(figsize=(8, 5))
+    sns.barplot(x=['Pagi (06:00 - 10:00)', 'Sore (15:00 - 19:00)'],
+            y=[avg_o3_pagi, avg_o3_sore],
+            palette='Set2',
+            hue=['Pagi', 'Sore'])
+
+    plt.title('Perbandingan Rata-rata Konsentrasi O₃ Pagi dan Sore di Stasiun Tiantan (2016)', fontsize=14)
+    plt.xlabel('Periode Waktu', fontsize=12)
+    plt.ylabel('Konsentrasi O₃ (µg/m³)', fontsize=12)
+
+    # Menambahkan nilai di atas setiap bar
+    for i, value in enumerate([avg_o3_pagi, avg_o3_sore]):
+        plt.text(i, value + 0.2, f'{value:.2f}', ha='center', va='bottom', fontsize=12)
+
+    plt.tight_layout()
+    return plt.gcf()
+
+def plot_pm_stasiun(filter_data):
+    # Membuat bar plot
+    plt.figure(figsize=(12, 6))
+    sns.barplot(
+        data=filter_data,
+        x='station', y='Konsentrasi', hue='Polutan', palette=['blue', 'green']
+    )
+    plt.xlabel('Stasiun')
+    plt.ylabel('Konsentrasi (µg/m³)')
+    plt.title('Rata-rata Konsentrasi PM2.5 dan PM10 di 3 Stasiun pada Tahun 2015')
+    return plt.gcf()
+
+# Gambar tren polutan pada ax, setiap garis di-downsample sesuai lebar ax dalam piksel
+def plot_tren(ax, waktu, nilai, polutan):
+    lebar_piksel = max(int(ax.bbox.width), 1)
+    for p in polutan:
+        y = nilai[:, polutan_cube.index(p)]
+        idx = downsample_minmax(y, lebar_piksel)
+        ax.plot(waktu[idx], y[idx], label=p, alpha=0.7)
+
+# Grafik tren polutan satu stasiun (dengan dan tanpa CO) untuk rentang waktu tertentu
+def figure_tren_stasiun(cube, waktu_awal, stations, station, mulai, selesai):
+    waktu, nilai = deret_stasiun(cube, waktu_awal, stations, station, mulai, selesai)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 7))
+
+    plot_tren(ax1, waktu, nilai, ['PM10', 'SO2', 'NO2', 'CO', 'O3', 'PM2.5'])
+    ax1.set_title(f'Tren Polutan di Stasiun {station} (Dengan CO)')
+    ax1.set_xlabel('Tanggal')
+    ax1.set_ylabel('Konsentrasi Polutan')
+    ax1.legend()
+
+    plot_tren(ax2, waktu, nilai, ['PM10', 'SO2', 'NO2', 'O3', 'PM2.5'])
+    ax2.set_title(f'Tren Polutan di Stasiun {station} (Tanpa CO)')
+    ax2.set_xlabel('Tanggal')
+    ax2.set_ylabel('Konsentrasi Polutan')
+    ax2.legend()
+
+    plt.tight_layout()
+    return fig
+
+# Wind rose satu stasiun: panjang batang adalah frekuensi arah angin, warnanya rata-rata polutan dari arah tersebut
+# tabel dan sumber adalah hasil analisis_arah_angin, panah menunjukkan arah sumber polutan
+def plot_wind_rose(tabel, sumber, station, polutan='PM2.5'):
+    data = tabel.loc[station]
+    sudut = np.deg2rad(np.arange(len(data)) * 360 / len(data))
+    skala = plt.Normalize(np.nanmin(tabel[polutan]), np.nanmax(tabel[polutan]))
+    warna = plt.cm.Reds(skala(data[polutan].to_numpy()))
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6), subplot_kw={'projection': 'polar'})
+    for ax in (ax1, ax2):
+        ax.set_theta_zero_location('N')
+        ax.set_theta_direction(-1)
+        ax.set_xticks(sudut)
+        ax.set_xticklabels(data.index)
+
+    ax1.bar(sudut, data['frekuensi'].to_numpy(), width=2 * np.pi / len(data) * 0.9, color=warna, edgecolor='gray')
+    ax1.set_title(f'Frekuensi Arah Angin (%) dan Rata-rata {polutan}\nStasiun {station}')
+    fig.colorbar(plt.cm.ScalarMappable(skala, cmap='Reds'), ax=ax1, pad=0.1, shrink=0.7, label=f'Rata-rata {polutan}')
+
+    ax2.bar(sudut, data['jam_tercemar'].to_numpy(), width=2 * np.pi / len(data) * 0.9, color='darkred', alpha=0.7)
+    # panah arah sumber hanya jika stasiun punya jam tercemar
+    arah = sumber.loc[station]
+    if data['jam_tercemar'].max() > 0:
+        ax2.annotate('', xy=(np.deg2rad(arah['derajat']), data['jam_tercemar'].max()), xytext=(0, 0),
+                     arrowprops={'arrowstyle': '->', 'color': 'black', 'linewidth': 2})
+    ax2.set_title(f'Jam PM2.5 Tidak Sehat per Arah Angin (%)\nArah sumber {polutan}: {arah["arah"]} ({arah["derajat"]:.0f}°)')
+
+    plt.tight_layout()
+    return fig
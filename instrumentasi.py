@@ -0,0 +1,134 @@
+# Instrumentasi ringan setiap tahap pipeline dan render halaman: waktu, memori dan cache hit/miss
+# catatan disimpan di memori (jumlahnya dibatasi) dan ditulis sebagai JSON lines ke file INSTRUMENTASI_LOG jika diatur
+# memori dibaca dari /proc/self/statm dan getrusage (bukan tracemalloc), sehingga cukup murah untuk selalu aktif
+# memori per tahap adalah selisih memori resident sebelum dan sesudah tahap (rss_naik_mb, bisa negatif jika memori dilepas);
+# peak_mb adalah puncak seluruh proses sejak mulai, bukan puncak tahap tersebut
+import os
+import sys
+import json
+import time
+import itertools
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # tidak tersedia di Windows
+    resource = None
+
+# File JSON lines tujuan catatan (untuk log shipper), None berarti hanya disimpan di memori
+log_path = os.environ.get("INSTRUMENTASI_LOG")
+
+# Catatan terakhir semua thread/sesi, yang paling lama dibuang jika penuh
+catatan = deque(maxlen=2000)
+_lock = threading.Lock()
+
+# Run dan tumpukan tahap yang sedang berjalan per thread (setiap rerun streamlit berjalan di thread-nya sendiri)
+_lokal = threading.local()
+_nomor_run = itertools.count(1)
+
+# Memori resident proses saat ini (bytes)
+def rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# Memori resident tertinggi proses sejak mulai (bytes), satuan ru_maxrss di macOS bytes dan di Linux KB
+def peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _mb(nilai):
+    return None if nilai is None else round(nilai / 2**20, 2)
+
+# Mulai run baru pada thread ini (satu kali eksekusi script atau satu job), mengembalikan nomor run
+def run_baru():
+    _lokal.run = next(_nomor_run)
+    _lokal.tumpukan = []
+    return _lokal.run
+
+def _tumpukan():
+    if not hasattr(_lokal, "tumpukan"):
+        _lokal.tumpukan = []
+    return _lokal.tumpukan
+
+# Mulai dan selesaikan satu tahap secara manual (untuk bagian script yang bukan fungsi)
+# cache: None jika tahap tidak di-cache, 'hit' jika di-cache (diganti 'miss' oleh cache_miss)
+def mulai_tahap(nama, cache=None):
+    tumpukan = _tumpukan()
+    tahap = {
+        'run': getattr(_lokal, "run", None),
+        'tahap': nama,
+        'induk': tumpukan[-1]['tahap'] if tumpukan else None,
+        'cache': cache,
+        '_mulai': time.perf_counter(),
+        '_rss': rss(),
+    }
+    tumpukan.append(tahap)
+    return tahap
+
+def selesai_tahap(tahap):
+    detik = time.perf_counter() - tahap.pop('_mulai')
+    rss_awal = tahap.pop('_rss')
+    tumpukan = _tumpukan()
+    if tahap in tumpukan:
+        del tumpukan[tumpukan.index(tahap):]
+
+    rss_akhir = rss()
+    tahap.update({
+        'waktu': round(time.time(), 3),
+        'detik': round(detik, 6),
+        'rss_mb': _mb(rss_akhir),
+        'rss_naik_mb': _mb(None if rss_akhir is None or rss_awal is None else rss_akhir - rss_awal),
+        'peak_mb': _mb(peak_rss()),
+    })
+    with _lock:
+        catatan.append(tahap)
+        if log_path:
+            with open(log_path, "a") as f:
+                f.write(json.dumps(tahap) + "\n")
+    return tahap
+
+# Context manager untuk mengukur satu tahap, tahap yang berada di dalam tahap lain dicatat dengan induknya
+@contextmanager
+def ukur_tahap(nama, cache=None):
+    tahap = mulai_tahap(nama, cache)
+    try:
+        yield tahap
+    finally:
+        selesai_tahap(tahap)
+
+# Decorator untuk mengukur setiap pemanggilan fungsi sebagai satu tahap (nama default: modul.fungsi)
+# cache=True untuk fungsi ber-cache: dicatat 'hit' kecuali isi fungsi memanggil cache_miss()
+def diukur(nama=None, cache=False):
+    def dekorator(fungsi):
+        modul = getattr(fungsi, "__module__", None)
+        nama_tahap = nama or (fungsi.__name__ if modul in (None, "__main__") else f"{modul}.{fungsi.__name__}")
+
+        @functools.wraps(fungsi)
+        def wrapper(*args, **kwargs):
+            with ukur_tahap(nama_tahap, 'hit' if cache else None):
+                return fungsi(*args, **kwargs)
+        return wrapper
+    return dekorator
+
+# Dipanggil di dalam fungsi ber-cache (hanya berjalan saat cache tidak ditemukan) untuk menandai tahap induknya 'miss'
+def cache_miss(status='miss'):
+    tumpukan = _tumpukan()
+    if tumpukan:
+        tumpukan[-1]['cache'] = status
+
+# Catatan satu run, urut sesuai waktu selesai
+def catatan_run(run):
+    with _lock:
+        return [tahap for tahap in catatan if tahap['run'] == run]
+
+# Catatan sebagai teks JSON lines
+def json_lines(daftar):
+    return "".join(json.dumps(tahap) + "\n" for tahap in daftar)
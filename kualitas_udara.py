@@ -0,0 +1,1118 @@
+# Inti pengolahan data kualitas udara tanpa streamlit dan tensorflow:
+# load, cleaning, labeling, rollup, data stream, korelasi, perhitungan analisis dan prediksi
+# dipakai oleh TubesStreamlit.py, batch_analisis.py dan benchmark.py
+import os
+import io
+import json
+import shutil
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import numpy as np
+
+from instrumentasi import diukur
+
+folder_path = "Dataset"
+
+# 16 arah mata angin pada kolom wd
+arah_angin = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
+              'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+
+# tipe data setiap kolom dataset PRSA (dipersempit agar hemat memori)
+dtype_kolom = {
+    'No': 'int32',
+    'year': 'uint16', 'month': 'uint8', 'day': 'uint8', 'hour': 'uint8',
+    'PM2.5': 'float32', 'PM10': 'float32', 'SO2': 'float32', 'NO2': 'float32',
+    'CO': 'float32', 'O3': 'float32', 'TEMP': 'float32', 'PRES': 'float32',
+    'DEWP': 'float32', 'RAIN': 'float32', 'WSPM': 'float32',
+    'wd': pd.CategoricalDtype(arah_angin),
+    'station': 'category',
+}
+
+# Kolom hasil pengukuran (polutan dan cuaca): diisi saat cleaning dan diagregasi pada tabel rollup
+kolom_rollup = ['PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3', 'TEMP', 'PRES', 'DEWP', 'RAIN', 'WSPM']
+
+# Tahun yang tidak lengkap, tidak dipakai pada data analisis
+tahun_dikecualikan = [2013, 2017]
+
+# Jumlah baris yang dibaca sekaligus saat load dan cleaning dataset, menentukan batas memori puncak
+chunksize = 100_000
+
+# Ukuran dan waktu modifikasi setiap file CSV, dipakai sebagai kunci cache
+def signature_dataset(folder_path):
+    signature = []
+    for file_name in sorted(os.listdir(path=folder_path)):
+        if file_name.endswith(".csv"):
+            stat = os.stat(os.path.join(folder_path, file_name))
+            signature.append((file_name, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+# Versi dataset yang ringkas untuk nama file dan folder cache
+def versi_dataset(versi):
+    return hashlib.sha1(repr(versi).encode()).hexdigest()[:12]
+
+# Versi skema tipe data, cache parquet dibuat ulang jika dtype_kolom berubah
+# (dari nama tipe dan kategorinya, bukan repr dtype yang ikut berubah dengan opsi tampilan pandas seperti display.width)
+versi_skema = versi_dataset({
+    kolom: (str(tipe), list(tipe.categories) if isinstance(tipe, pd.CategoricalDtype) else None)
+    for kolom, tipe in dtype_kolom.items()
+})
+
+# Gap kosong (jam berurutan) yang panjangnya paling banyak batas_gap_pendek diisi interpolasi waktu,
+# gap yang lebih panjang diisi rata-rata musiman stasiun (bulan x jam dalam sehari)
+batas_gap_pendek = 6
+
+# Versi statistik tahap 1 dan cara imputasi, cache dibuat ulang jika berubah
+versi_imputasi = versi_dataset(('interpolasi-musiman', batas_gap_pendek))
+
+# Kolom gap mask pada data bersih: bitmask uint16, bit ke-i menandai kolom_rollup[i] diisi dengan cara tersebut
+kolom_gap = ['gap_interpolasi', 'gap_musiman']
+
+# Jumlah dan banyak data per (stasiun x bulan x jam) dari satu chunk, array berukuran (stasiun, 12, 24, kolom)
+# dihitung dengan bincount per kolom pada kunci gabungan, bukan groupby per kelompok
+def stat_musiman(chunk):
+    n_station = len(chunk['station'].cat.categories)
+    kunci = (chunk['station'].cat.codes.to_numpy('int64') * 12 + chunk['month'].to_numpy('int64') - 1) * 24 + chunk['hour'].to_numpy('int64')
+    nilai = chunk[kolom_rollup].to_numpy('float64')
+    ada = ~np.isnan(nilai)
+
+    jumlah = np.stack([np.bincount(kunci, np.where(ada[:, i], nilai[:, i], 0), n_station * 288) for i in range(len(kolom_rollup))], axis=-1)
+    banyak = np.stack([np.bincount(kunci[ada[:, i]], minlength=n_station * 288) for i in range(len(kolom_rollup))], axis=-1)
+    return jumlah.reshape(n_station, 12, 24, len(kolom_rollup)), banyak.reshape(n_station, 12, 24, len(kolom_rollup))
+
+# Tambahkan jumlah, banyak data (total dan musiman) dan arah angin pertama/terakhir per stasiun dari satu chunk ke stat
+def tambah_stat(stat, chunk):
+    per_station = chunk.groupby('station', observed=True)
+    jumlah = per_station[kolom_rollup].sum()
+    banyak = per_station[kolom_rollup].count()
+    wd_awal = per_station['wd'].first()
+    wd_akhir = per_station['wd'].last()
+    musiman_sum, musiman_count = stat_musiman(chunk)
+
+    for station in jumlah.index:
+        s = stat.setdefault(station, {
+            'sum': dict.fromkeys(kolom_rollup, 0.0), 'count': dict.fromkeys(kolom_rollup, 0),
+            'wd_awal': None, 'wd_akhir': None,
+            'musiman_sum': np.zeros((12, 24, len(kolom_rollup))), 'musiman_count': np.zeros((12, 24, len(kolom_rollup)), dtype='int64'),
+        })
+        for kolom in kolom_rollup:
+            s['sum'][kolom] += float(jumlah.at[station, kolom])
+            s['count'][kolom] += int(banyak.at[station, kolom])
+        if s['wd_awal'] is None and pd.notna(wd_awal[station]):
+            s['wd_awal'] = wd_awal[station]
+        if pd.notna(wd_akhir[station]):
+            s['wd_akhir'] = wd_akhir[station]
+        kode = chunk['station'].cat.categories.get_loc(station)
+        s['musiman_sum'] += musiman_sum[kode]
+        s['musiman_count'] += musiman_count[kode]
+    return stat
+
+# Jumlah worker untuk memproses file/stasiun secara paralel (1 = berurutan), bisa diatur dengan env N_WORKER
+n_worker = int(os.environ.get("N_WORKER", os.cpu_count() or 1))
+
+# Jalankan fungsi untuk setiap item (tuple argumen) dengan thread pool, hasil urut sesuai items
+# thread cukup karena bagian berat (parsing CSV, baca/tulis parquet) sebagian besar berjalan di luar GIL
+def jalankan_paralel(fungsi, items, n_worker=n_worker):
+    if n_worker <= 1 or len(items) <= 1:
+        return [fungsi(*item) for item in items]
+    with ThreadPoolExecutor(max_workers=n_worker) as pool:
+        return list(pool.map(lambda item: fungsi(*item), items))
+
+# Tahap 1: baca satu file CSV per chunk ke cache parquet sambil menghitung statistik per stasiun
+# parsing ulang hanya jika file CSV berubah; mengembalikan entri manifest file tersebut (versi dan statistik)
+def load_station_file(folder_path, cache_path, file_name, size, mtime, tercatat, chunksize=chunksize):
+    parquet_path = os.path.join(cache_path, file_name[:-len(".csv")] + ".parquet")
+
+    if isinstance(tercatat, dict) and tercatat['versi'] == [size, mtime, versi_skema, versi_imputasi] and os.path.exists(parquet_path):
+        return tercatat
+
+    # tulis ke file sementara dulu agar cache tidak rusak jika proses terhenti
+    tmp_path = parquet_path + ".tmp"
+    stat, writer = {}, None
+    for chunk in pd.read_csv(os.path.join(folder_path, file_name), dtype=dtype_kolom, chunksize=chunksize):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(tmp_path, table.schema)
+        writer.write_table(table)
+        tambah_stat(stat, chunk)
+    writer.close()
+    os.replace(tmp_path, parquet_path)
+
+    # array musiman disimpan sebagai list agar bisa ditulis ke manifest JSON
+    for s in stat.values():
+        s['musiman_sum'] = s['musiman_sum'].tolist()
+        s['musiman_count'] = s['musiman_count'].tolist()
+    return {'versi': [size, mtime, versi_skema, versi_imputasi], 'stat': stat}
+
+# Gabungkan statistik beberapa file (satu stasiun bisa tersebar di beberapa file, urut sesuai nama file)
+def gabung_stat(stat_list):
+    gabungan = {}
+    for stat in stat_list:
+        for station, s in stat.items():
+            g = gabungan.setdefault(station, {
+                'sum': dict.fromkeys(kolom_rollup, 0.0), 'count': dict.fromkeys(kolom_rollup, 0),
+                'wd_awal': None, 'wd_akhir': None,
+                'musiman_sum': np.zeros((12, 24, len(kolom_rollup))), 'musiman_count': np.zeros((12, 24, len(kolom_rollup)), dtype='int64'),
+            })
+            for kolom in kolom_rollup:
+                g['sum'][kolom] += s['sum'][kolom]
+                g['count'][kolom] += s['count'][kolom]
+            g['wd_awal'] = g['wd_awal'] or s['wd_awal']
+            g['wd_akhir'] = s['wd_akhir'] or g['wd_akhir']
+            g['musiman_sum'] += np.asarray(s['musiman_sum'])
+            g['musiman_count'] += np.asarray(s['musiman_count'], dtype='int64')
+    return gabungan
+
+# Rata-rata musiman (12 x 24 x kolom) satu stasiun, bulan x jam tanpa data memakai rata-rata stasiun
+# (tetap NaN jika kolom tersebut tidak punya data sama sekali pada stasiun ini)
+def rata_musiman(s):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        musiman = s['musiman_sum'] / s['musiman_count']
+        rata = np.array([s['sum'][kolom] for kolom in kolom_rollup]) / np.array([s['count'][kolom] for kolom in kolom_rollup])
+    return np.where(np.isnan(musiman), rata, musiman)
+
+# Imputasi satu deret stasiun yang urut waktu, semua kolom sekaligus dengan array (baris x kolom)
+# jam: jam sejak epoch (int64) setiap baris, nilai: float dengan NaN, bulan/jam_hari: posisi pada tabel musiman
+# gap pendek diinterpolasi linear menurut waktu antara nilai sebelum dan sesudahnya,
+# gap panjang dan gap di awal/akhir deret diisi rata-rata musiman (lihat rata_musiman)
+# mengembalikan nilai hasil imputasi serta mask (baris x kolom) nilai yang diinterpolasi dan yang diisi rata-rata musiman
+def imputasi_deret(jam, nilai, musiman, bulan, jam_hari, batas=batas_gap_pendek):
+    n, k = nilai.shape
+    kosong = np.isnan(nilai)
+    if not kosong.any():
+        return nilai, kosong, kosong
+
+    # posisi nilai terakhir sebelum dan nilai pertama sesudah setiap baris (n jika tidak ada)
+    posisi = np.arange(n)[:, None]
+    sebelum = np.maximum.accumulate(np.where(kosong, -1, posisi), axis=0)
+    sesudah = np.minimum.accumulate(np.where(kosong, n, posisi)[::-1], axis=0)[::-1]
+    i0, i1 = np.clip(sebelum, 0, n - 1), np.clip(sesudah, 0, n - 1)
+    t0, t1 = jam[i0], jam[i1]
+
+    interpolasi = kosong & (sebelum >= 0) & (sesudah < n) & (t1 - t0 - 1 <= batas)
+    kolom = np.arange(k)
+    v0, v1 = nilai[i0, kolom], nilai[i1, kolom]
+    with np.errstate(invalid='ignore'):
+        hasil = np.where(interpolasi, v0 + (v1 - v0) * ((jam[:, None] - t0) / np.maximum(t1 - t0, 1)), nilai)
+
+    isi = musiman[bulan, jam_hari]
+    musim = kosong & ~interpolasi & ~np.isnan(isi)
+    hasil[musim] = isi[musim]
+    return hasil.astype(nilai.dtype), interpolasi, musim
+
+# Mask (baris x kolom_rollup) menjadi bitmask uint16 per baris
+def bitmask(mask):
+    return (mask.astype('uint16') << np.arange(mask.shape[1], dtype='uint16')).sum(axis=1, dtype='uint16')
+
+# Tahap 2: cleaning satu stasiun yang sudah urut waktu dengan statistik tahap 1 stasiun tersebut (lihat imputasi_deret)
+# arah angin kosong diisi nilai sebelumnya, di awal data dipakai arah angin pertama
+def cleaning_station(df, s):
+    df = df.drop(columns='No')
+    waktu = pd.to_datetime(df[['year', 'month', 'day', 'hour']])
+    jam = (waktu - pd.Timestamp(0)) // pd.Timedelta(hours=1)
+
+    nilai, interpolasi, musim = imputasi_deret(
+        jam.to_numpy('int64'), df[kolom_rollup].to_numpy('float32'), rata_musiman(s),
+        df['month'].to_numpy('int64') - 1, df['hour'].to_numpy('int64'),
+    )
+    df[kolom_rollup] = nilai
+    df['gap_interpolasi'] = bitmask(interpolasi)
+    df['gap_musiman'] = bitmask(musim)
+
+    df['wd'] = df['wd'].ffill().fillna(pd.Series(s['wd_awal'], index=df.index, dtype=dtype_kolom['wd']))
+    return df
+
+# Tahap 2 untuk satu stasiun: baris stasiun dari setiap file dibaca per chunk lalu digabung menjadi satu deret urut waktu
+# (interpolasi butuh nilai sebelum dan sesudah gap), dicleaning, dilabeli, lalu ditulis per tahun ke folder stasiun
+# memori puncak per worker sebesar data satu stasiun; setiap stasiun menulis foldernya sendiri, sehingga aman diparalelkan
+def proses_station(cache_path, partisi_path, station, file_list, stat, chunksize=chunksize):
+    bagian = []
+    for file_name in file_list:
+        parquet_file = pq.ParquetFile(os.path.join(cache_path, file_name[:-len(".csv")] + ".parquet"))
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            chunk = batch.to_pandas()
+            bagian.append(chunk[chunk['station'] == station])
+    df = pd.concat(bagian, ignore_index=True).sort_values(['year', 'month', 'day', 'hour'], kind='stable', ignore_index=True)
+    df = tambah_label(cleaning_station(df, stat[station]))
+
+    os.makedirs(os.path.join(partisi_path, station), exist_ok=True)
+    for year, data in df.groupby('year', sort=False):
+        pq.write_table(pa.Table.from_pandas(data, preserve_index=False), os.path.join(partisi_path, station, f"{year}.parquet"))
+
+# Load, cleaning dan labeling dataset secara bertahap: tahap 1 membaca per chunk (memori dibatasi chunksize),
+# tahap 2 memproses satu stasiun sekaligus (memori dibatasi ukuran data satu stasiun, bukan seluruh dataset)
+# tahap 1 dijalankan paralel per file, tahap 2 paralel per stasiun dengan n_worker
+# hasil ditulis per stasiun/tahun ke folder cache (default folder_path/.cache), satu folder per versi dataset
+# mengembalikan folder hasil cleaning dan statistik per stasiun (dipakai juga untuk imputasi data stream)
+@diukur()
+def siapkan_dataset(folder_path, signature, cache_path=None, chunksize=chunksize, n_worker=n_worker):
+    cache_path = cache_path or os.path.join(folder_path, ".cache")
+    os.makedirs(cache_path, exist_ok=True)
+    manifest_path = os.path.join(cache_path, "manifest.json")
+
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    # entri file CSV yang sudah tidak ada ikut terhapus
+    manifest_baru = dict(zip(
+        [file_name for file_name, _, _ in signature],
+        jalankan_paralel(load_station_file, [
+            (folder_path, cache_path, file_name, size, mtime, manifest.get(file_name), chunksize)
+            for file_name, size, mtime in signature
+        ], n_worker),
+    ))
+    if manifest_baru != manifest:
+        with open(manifest_path, "w") as f:
+            json.dump(manifest_baru, f)
+
+    stat = gabung_stat([manifest_baru[file_name]['stat'] for file_name, _, _ in signature])
+
+    partisi_path = os.path.join(cache_path, f"bersih-{versi_dataset((signature, versi_skema, versi_imputasi))}")
+    if not os.path.isdir(partisi_path):
+        tmp_path = partisi_path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        jalankan_paralel(proses_station, [
+            (cache_path, tmp_path, station, [file_name for file_name, _, _ in signature if station in manifest_baru[file_name]['stat']], stat, chunksize)
+            for station in sorted(stat)
+        ], n_worker)
+        os.replace(tmp_path, partisi_path)
+
+        # hapus hasil cleaning versi dataset sebelumnya
+        for nama in os.listdir(cache_path):
+            if nama.startswith("bersih-") and os.path.join(cache_path, nama) != partisi_path:
+                shutil.rmtree(os.path.join(cache_path, nama), ignore_errors=True)
+
+    return partisi_path, stat
+
+# Daftar file partisi (stasiun, path) urut stasiun lalu tahun, tahun adalah fungsi untuk memilih partisi tahun
+def daftar_partisi(partisi_path, tahun=lambda year: True):
+    return [
+        (station, os.path.join(partisi_path, station, file_name))
+        for station in sorted(os.listdir(partisi_path))
+        for file_name in sorted(os.listdir(os.path.join(partisi_path, station)), key=lambda nama: int(nama.split(".")[0]))
+        if tahun(int(file_name.split(".")[0]))
+    ]
+
+# Baca hasil cleaning per stasiun/tahun secara paralel lalu digabung (urut stasiun lalu tahun)
+# kolom=None membaca semua kolom
+def baca_partisi(partisi_path, tahun=lambda year: True, kolom=None, n_worker=n_worker):
+    df_list = jalankan_paralel(pd.read_parquet, [(path, 'auto', kolom) for _, path in daftar_partisi(partisi_path, tahun)], n_worker)
+
+    # samakan kategori station agar hasil concat tetap bertipe category
+    stations = sorted(set().union(*(data['station'].cat.categories for data in df_list)))
+    for data in df_list:
+        data['station'] = data['station'].cat.set_categories(stations)
+        data['wd'] = data['wd'].astype(dtype_kolom['wd'])
+
+    return pd.concat(df_list, ignore_index=True)
+
+# Data bersih lengkap (dengan label) dan data 2014-2016, dibaca dari hasil cleaning per stasiun/tahun
+@diukur()
+def cleaning_data(partisi_path) :
+    df_clean = baca_partisi(partisi_path)
+
+    # Data analisis hanya tahun 2014-2016 (partisi tahun lain tidak dibaca)
+    df_filtered = baca_partisi(
+        partisi_path, lambda year: year not in tahun_dikecualikan,
+        kolom=[kolom for kolom in dtype_kolom if kolom != 'No'],
+    )
+    return df_clean, df_filtered
+
+# Koordinat stasiun yang sudah ada
+stations_coordinates = {
+    "Aotizhongxin": {"lat": 39.9996, "lon": 116.4187},
+    "Changping": {"lat": 40.2203, "lon": 116.2319},
+    "Dingling": {"lat": 39.9391, "lon": 116.2883},
+    "Dongsi": {"lat": 39.9335, "lon": 116.4206},
+    "Guanyuan": {"lat": 39.9515, "lon": 116.3198},
+    "Gucheng": {"lat": 39.9167, "lon": 116.2627},
+    "Huairou": {"lat": 40.3125, "lon": 116.6347},
+    "Nongzhanguan": {"lat": 39.9934, "lon": 116.3493},
+    "Shunyi": {"lat": 40.1305, "lon": 116.6530},
+    "Tiantan": {"lat": 39.8825, "lon": 116.4179},
+    "Wanliu": {"lat": 39.9575, "lon": 116.3190},
+    "Wanshouxigong": {"lat": 39.8887, "lon": 116.3066},
+}
+
+# Koordinat sebagai tabel kecil per stasiun, tidak disalin ke setiap baris data
+koordinat_station = pd.DataFrame.from_dict(stations_coordinates, orient='index')
+
+# Tambahkan kolom label kualitas udara pada data bersih
+def tambah_label(df_tes):
+    df_tes['label'] = label_kualitas_udara(df_tes['PM2.5'])
+    return df_tes
+
+# Label sudah dihitung per stasiun saat cleaning, di sini data semua stasiun digabung per waktu
+@diukur()
+def labeling_udara(df_cleaned) :
+    df_tes = df_cleaned.copy()
+    df_tes['datetime'] = pd.to_datetime(df_tes[['year', 'month', 'day', 'hour']])
+
+    # Urutkan berdasarkan waktu agar setiap jam menjadi satu blok baris yang berurutan
+    df_tes = df_tes.sort_values(['year', 'month', 'day', 'hour', 'station'], kind='stable').reset_index(drop=True)
+
+    return df_tes
+
+# Tambahkan blok baris setiap jam ke index, waktu adalah array (baris x [year, month, day, hour]) yang sudah urut
+# offset adalah posisi baris pertama waktu pada df_label
+def tambah_index(index, waktu, offset=0):
+    if len(waktu) == 0:
+        return index
+
+    # posisi baris tempat jam berganti
+    batas = np.flatnonzero((waktu[1:] != waktu[:-1]).any(axis=1)) + 1
+    starts = np.concatenate([[0], batas])
+    stops = np.concatenate([batas, [len(waktu)]])
+
+    for (year, month, day, hour), start, stop in zip(waktu[starts].tolist(), starts.tolist(), stops.tolist()):
+        index.setdefault(year, {}).setdefault(month, {}).setdefault(day, {})[hour] = (start + offset, stop + offset)
+    return index
+
+# Salinan index tanpa entri mulai waktu potong (year, month, day, hour) dan sesudahnya
+# hanya level yang berubah yang disalin, index lama tetap utuh untuk sesi yang sedang memakainya
+def potong_index(index, potong):
+    hasil = {}
+    for kunci, isi in index.items():
+        if kunci < potong[0]:
+            hasil[kunci] = isi
+        elif kunci == potong[0] and len(potong) > 1:
+            isi = potong_index(isi, potong[1:])
+            if isi:
+                hasil[kunci] = isi
+    return hasil
+
+# Index bertingkat tahun -> bulan -> hari -> jam -> (baris awal, baris akhir) pada df_label
+@diukur()
+def index_waktu(df_label):
+    return tambah_index({}, df_label[['year', 'month', 'day', 'hour']].to_numpy())
+
+# Filter Dashboard: blok baris df_label untuk satu jam dari index, station=None berarti semua stasiun
+@diukur()
+def filter_jam(df_label, df_index, year, month, day, hour, station=None):
+    start, stop = df_index[year][month][day][hour]
+    filtered_df = df_label.iloc[start:stop]
+
+    if station is not None:
+        filtered_df = filtered_df[filtered_df["station"] == station]
+    return filtered_df
+
+# Skema awal tanpa penyempitan tipe data (tipe bawaan pd.read_csv, teks untuk station/wd/label, lat/lon di setiap baris)
+# hanya dipakai sebagai pembanding pada laporan memori
+dtype_awal = {
+    **{kolom: 'int64' for kolom in ['year', 'month', 'day', 'hour']},
+    **{kolom: 'float64' for kolom in kolom_rollup},
+    'wd': 'object', 'station': 'object', 'label': 'object',
+}
+
+# Laporan memori per kolom (bytes) df_label sebelum dan sesudah skema ringkas
+# memori sebelum diperkirakan dari sampel baris yang diubah ke skema awal, agar seluruh data tidak perlu disalin
+def laporan_memori(df_label, n_sampel=10_000):
+    sampel = df_label.head(n_sampel).astype(dtype_awal)
+    sampel['lat'] = sampel['station'].map(koordinat_station['lat'])
+    sampel['lon'] = sampel['station'].map(koordinat_station['lon'])
+    sebelum = sampel.memory_usage(index=False, deep=True) / len(sampel) * len(df_label)
+
+    sesudah = df_label.memory_usage(index=False, deep=True)
+    sesudah['lat'] = koordinat_station['lat'].nbytes
+    sesudah['lon'] = koordinat_station['lon'].nbytes
+
+    laporan = pd.DataFrame({'sebelum': sebelum, 'sesudah': sesudah}).fillna(0).astype('int64')
+    laporan.loc['total'] = laporan.sum()
+    return laporan
+
+# Persentase nilai setiap kolom yang diisi interpolasi dan rata-rata musiman per stasiun (dari gap mask df_label)
+# baris terakhir 'semua stasiun' untuk seluruh data
+def ringkasan_imputasi(df_label):
+    bit = np.arange(len(kolom_rollup), dtype='uint16')
+    ringkasan = {}
+    for nama, kolom in zip(['interpolasi', 'musiman'], kolom_gap):
+        mask = pd.DataFrame((df_label[kolom].to_numpy()[:, None] >> bit) & 1, columns=kolom_rollup, index=df_label.index)
+        persen = mask.groupby(df_label['station'], observed=True).mean() * 100
+        persen.loc['semua stasiun'] = mask.mean() * 100
+        ringkasan[nama] = persen
+    return pd.concat(ringkasan, axis=1).round(2)
+
+# Kategori kualitas udara, urut dari yang paling baik
+label_aqi = ['good', 'moderate', 'unhealthy for sensitive groups', 'unhealthy', 'very unhealthy', 'hazardous']
+dtype_label = pd.CategoricalDtype(['unknown'] + label_aqi, ordered=True)
+
+# Batas atas konsentrasi (µg/m³) setiap kategori kecuali 'hazardous', mengikuti standar IAQI China (HJ 633-2012)
+breakpoint_aqi = {
+    'PM2.5': [35, 75, 115, 150, 250],
+    'PM10': [50, 150, 250, 350, 420],
+    'O3': [160, 200, 300, 400, 800],
+    'NO2': [100, 200, 700, 1200, 2340],
+}
+
+# membuat function untuk labeling, sekaligus untuk seluruh nilai (nilai <= 0 atau kosong menjadi 'unknown')
+def label_kualitas_udara(values, polutan='PM2.5', breakpoint=None):
+    if breakpoint is None:
+        breakpoint = breakpoint_aqi[polutan]
+
+    values = np.asarray(values, dtype='float64')
+    codes = np.searchsorted(breakpoint, values, side='left') + 1
+    codes[~(values > 0)] = 0
+    return pd.Categorical.from_codes(codes, dtype=dtype_label)
+
+# Warna kualitas udara berdasarkan urutan kategori dtype_label ('unknown' berwarna biru)
+warna_label = ['blue', 'green', 'yellow', 'orange', 'red', 'purple', 'darkred']
+
+# Polutan yang disimpan pada cube animasi peta
+polutan_cube = ['PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3']
+
+# Cube array (stasiun x jam x polutan) bertipe float32 untuk animasi peta, jam ke-0 adalah waktu_awal
+@diukur()
+def cube_polutan(df_label):
+    waktu_awal = df_label['datetime'].min()
+    jam = ((df_label['datetime'] - waktu_awal) // pd.Timedelta(hours=1)).to_numpy()
+    kode_station = df_label['station'].cat.codes.to_numpy()
+
+    cube = np.full((len(df_label['station'].cat.categories), jam.max() + 1, len(polutan_cube)), np.nan, dtype='float32')
+    cube[kode_station, jam] = df_label[polutan_cube].to_numpy(dtype='float32')
+    return cube, waktu_awal, df_label['station'].cat.categories.tolist()
+
+# Kategori yang dicatat pada index episode polusi, mulai dari 'unhealthy for sensitive groups'
+kategori_episode = label_aqi[2:]
+
+# Index episode polusi: rangkaian jam berurutan pada satu stasiun dengan kategori polutan >= kategori tertentu
+# dideteksi dengan run-length pada array kategori (stasiun x jam) cube untuk semua stasiun sekaligus
+# (setiap baris diberi padding False di kedua sisi agar episode tidak menyambung ke stasiun berikutnya);
+# jam yang kosong pada cube ('unknown') memutus episode
+# mengembalikan dict kategori -> tabel episode (station, mulai, selesai, durasi jam, puncak, waktu_puncak, jam_mulai)
+# yang diurutkan dari durasi terpanjang, sehingga query durasi minimal cukup memotong tabel (lihat cari_episode)
+@diukur()
+def index_episode(cube, waktu_awal, stations, polutan='PM2.5'):
+    nilai = cube[:, :, polutan_cube.index(polutan)]
+    n_station, n_jam = nilai.shape
+    kode = label_kualitas_udara(nilai.ravel(), polutan).codes.reshape(nilai.shape)
+    nilai_datar = np.pad(nilai, ((0, 0), (1, 1))).ravel()
+
+    index = {}
+    for kategori in kategori_episode:
+        aktif = np.pad(kode >= dtype_label.categories.get_loc(kategori), ((0, 0), (1, 1))).ravel()
+        beda = np.diff(aktif.astype('int8'))
+        mulai = np.flatnonzero(beda == 1) + 1
+        selesai = np.flatnonzero(beda == -1) + 1
+        durasi = selesai - mulai
+
+        # puncak setiap episode dan jam pertama nilai puncak tersebut: di luar episode bernilai -inf,
+        # sehingga segmen reduceat dari awal satu episode sampai awal episode berikutnya hanya mengambil nilai episode itu
+        # (NaN di antara atau sesudah episode tidak ikut terbawa)
+        puncak = np.maximum.reduceat(np.where(aktif, nilai_datar, -np.inf), mulai) if len(mulai) else np.empty(0, 'float32')
+        posisi = np.flatnonzero(aktif)
+        episode = np.repeat(np.arange(len(mulai)), durasi)
+        sama = nilai_datar[posisi] == puncak[episode]
+        _, pertama = np.unique(episode[sama], return_index=True)
+        posisi_puncak = posisi[sama][pertama]
+
+        jam_mulai = mulai % (n_jam + 2) - 1
+        tabel = pd.DataFrame({
+            'station': pd.Categorical.from_codes(mulai // (n_jam + 2), categories=stations),
+            'mulai': waktu_awal + pd.to_timedelta(jam_mulai, unit='h'),
+            'selesai': waktu_awal + pd.to_timedelta(jam_mulai + durasi - 1, unit='h'),
+            'durasi': durasi.astype('int32'),
+            'puncak': puncak.astype('float32'),
+            'waktu_puncak': waktu_awal + pd.to_timedelta(posisi_puncak % (n_jam + 2) - 1, unit='h'),
+            'jam_mulai': jam_mulai,
+        })
+        index[kategori] = tabel.sort_values(['durasi', 'mulai'], ascending=[False, True], kind='stable', ignore_index=True)
+    return index
+
+# Episode satu kategori dengan durasi minimal (jam), station=None berarti semua stasiun
+# diambil dari index tanpa memindai data ulang: tabel urut durasi menurun sehingga cukup dipotong dengan searchsorted
+def cari_episode(index, kategori, durasi_min=1, station=None):
+    tabel = index[kategori]
+    n = np.searchsorted(-tabel['durasi'].to_numpy(), -durasi_min, side='right')
+    hasil = tabel.iloc[:n]
+
+    if station is not None:
+        hasil = hasil[hasil['station'] == station]
+    return hasil
+
+# Tabel rollup harian dan per jam dalam sehari (per tahun) langsung dari data per jam
+def rollup_dasar(df):
+    per_hari = df.groupby(['station', 'year', 'month', 'day'], observed=True)[kolom_rollup]
+    harian = pd.concat({'sum': per_hari.sum(), 'count': per_hari.count()}, axis=1)
+
+    per_jam = df.groupby(['station', 'year', 'hour'], observed=True)[kolom_rollup]
+    jam = pd.concat({'sum': per_jam.sum(), 'count': per_jam.count()}, axis=1)
+    return harian, jam
+
+# Tabel bulanan dan tahunan cukup dijumlahkan dari tabel harian
+def rollup_lengkap(harian, jam):
+    bulanan = harian.groupby(level=['station', 'year', 'month'], observed=True).sum()
+    tahunan = bulanan.groupby(level=['station', 'year'], observed=True).sum()
+    return {'harian': harian, 'bulanan': bulanan, 'tahunan': tahunan, 'jam': jam}
+
+# Tabel rollup harian dan per jam satu stasiun, dibaca dari partisi tahun analisis stasiun tersebut
+# kategori station disamakan dengan stations agar hasil semua stasiun bisa digabung
+# stasiun tanpa partisi tahun analisis (misalnya data baru yang hanya berisi 2017) menghasilkan tabel kosong dengan kolom yang sama
+def rollup_station(partisi_path, station, stations):
+    kolom = ['station', 'year', 'month', 'day', 'hour'] + kolom_rollup
+    paths = [path for s, path in daftar_partisi(partisi_path, lambda year: year not in tahun_dikecualikan) if s == station]
+    if paths:
+        df = pd.concat([pd.read_parquet(path, columns=kolom) for path in paths], ignore_index=True)
+    else:
+        df = pd.read_parquet(next(path for s, path in daftar_partisi(partisi_path) if s == station), columns=kolom).iloc[:0]
+    df['station'] = df['station'].cat.set_categories(stations)
+    return rollup_dasar(df)
+
+# Tabel rollup per stasiun: harian, bulanan, tahunan, dan per jam dalam sehari (per tahun)
+# setiap tabel menyimpan jumlah (sum) dan banyak data (count), sehingga level di atasnya cukup menjumlahkan level di bawahnya
+# tabel harian dan per jam dihitung paralel per stasiun lalu digabung
+@diukur()
+def rollup_data(partisi_path, n_worker=n_worker):
+    stations = sorted(os.listdir(partisi_path))
+    hasil = jalankan_paralel(rollup_station, [(partisi_path, station, stations) for station in stations], n_worker)
+    return rollup_lengkap(
+        pd.concat([harian for harian, _ in hasil]),
+        pd.concat([jam for _, jam in hasil]),
+    )
+
+# Rata-rata dari tabel rollup
+def rata_rata(rollup):
+    return rollup['sum'] / rollup['count']
+
+# Folder tempat file CSV data per jam yang baru masuk (format kolom sama dengan file PRSA)
+# file baru dan baris yang ditambahkan di akhir file dibaca saat aplikasi dijalankan ulang
+stream_path = os.path.join(folder_path, "masuk")
+
+# tipe data file di folder stream_path, station dibaca sebagai teks lalu disamakan dengan kategori stasiun yang ada
+dtype_masuk = {**dtype_kolom, 'station': 'str'}
+
+# State data yang bisa bertambah saat aplikasi berjalan, dimulai dari data hasil cleaning
+# frame dan index pada state tidak diubah di tempat tetapi diganti dengan yang baru,
+# sehingga aman dibaca bersama selama perubahan dilakukan dengan stream['lock'] dipegang
+@diukur()
+def buat_stream(partisi_path, stat_station, df_cleaned, df_filtered):
+    df_label = labeling_udara(df_cleaned)
+    cube, waktu_awal, stations = cube_polutan(df_label)
+
+    # jumlah dan banyak data (total dan musiman) per stasiun sebelum imputasi (dari tahap 1 load dataset), untuk mengisi data baru
+    stat = {station: stat_station[station] for station in stations}
+    wd_terakhir = pd.Categorical([s['wd_akhir'] for s in stat.values()], dtype=dtype_kolom['wd']).codes.copy()
+
+    return {
+        'lock': threading.Lock(),
+        'versi': 0,  # bertambah setiap ada data baru
+        # isi data baru yang masuk ke data analisis: (banyak baris, jumlah hash baris mod 2^64)
+        # berasal dari isi data, bukan counter, sehingga aman dipakai sebagai kunci cache disk setelah aplikasi dijalankan ulang
+        'versi_analisis': (0, 0),
+        'jumlah_baris': 0,
+        'files': {},  # file_name -> (size, mtime, posisi byte yang sudah dibaca)
+        'sum': pd.DataFrame([s['sum'] for s in stat.values()], index=stations)[kolom_rollup],
+        'count': pd.DataFrame([s['count'] for s in stat.values()], index=stations)[kolom_rollup],
+        'musiman_sum': np.stack([s['musiman_sum'] for s in stat.values()]),
+        'musiman_count': np.stack([s['musiman_count'] for s in stat.values()]),
+        'wd_terakhir': wd_terakhir,
+        'df_label': df_label,
+        'df_index': index_waktu(df_label),
+        'df_filtered': df_filtered,
+        'rollups': rollup_data(partisi_path),
+        'cube': cube,
+        'waktu_awal': waktu_awal,
+        'stations': stations,
+        'versi_jam': np.zeros(cube.shape[1], dtype='int32'),  # versi terakhir setiap jam pada cube
+    }
+
+# Tambahkan data per jam yang baru ke state stream (dipanggil saat stream['lock'] dipegang)
+# hanya baris baru yang diproses: rata-rata imputasi, label, index, cube dan rollup diperbarui bertahap
+# nilai kosong data baru diisi rata-rata musiman (nilai sesudahnya belum ada, sehingga tidak diinterpolasi)
+# baris untuk (stasiun, jam) yang sudah ada dan stasiun tanpa koordinat diabaikan
+# mengembalikan jumlah baris yang ditambahkan
+@diukur()
+def tambah_data(stream, baru):
+    baru = baru.drop(columns='No', errors='ignore')
+    baru = baru.astype({kolom: tipe for kolom, tipe in dtype_kolom.items() if kolom in baru and kolom != 'station'})
+    baru['station'] = pd.Categorical(baru['station'].astype(str), categories=stream['stations'])
+    baru['datetime'] = pd.to_datetime(baru[['year', 'month', 'day', 'hour']])
+
+    cube, waktu_awal, versi_jam = stream['cube'], stream['waktu_awal'], stream['versi_jam']
+    jam = ((baru['datetime'] - waktu_awal) // pd.Timedelta(hours=1)).to_numpy()
+    kode_station = baru['station'].cat.codes.to_numpy()
+
+    pakai = (kode_station >= 0) & (jam >= 0)
+    di_cube = pakai & (jam < cube.shape[1])
+    pakai[di_cube] = np.isnan(cube[kode_station[di_cube], jam[di_cube], 0])
+    baru = baru[pakai].drop_duplicates(['station', 'datetime'], keep='last')
+    if len(baru) == 0:
+        return 0
+
+    baru = baru.sort_values(['station', 'datetime'], kind='stable')
+    kode_station = baru['station'].cat.codes.to_numpy()
+
+    # rata-rata per stasiun dan musiman diperbarui dengan data baru, lalu dipakai mengisi nilai yang kosong
+    per_station = baru.groupby('station', observed=False)
+    stream['sum'] = stream['sum'] + per_station[kolom_rollup].sum().to_numpy()
+    stream['count'] = stream['count'] + per_station[kolom_rollup].count().to_numpy()
+    musiman_sum, musiman_count = stat_musiman(baru)
+    stream['musiman_sum'] = stream['musiman_sum'] + musiman_sum
+    stream['musiman_count'] = stream['musiman_count'] + musiman_count
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        musiman = stream['musiman_sum'] / stream['musiman_count']
+    rata = (stream['sum'] / stream['count']).to_numpy()
+    isi = np.where(np.isnan(musiman), rata[:, None, None, :], musiman)[
+        kode_station, baru['month'].to_numpy('int64') - 1, baru['hour'].to_numpy('int64')]
+    nilai = baru[kolom_rollup].to_numpy('float32')
+    musim = np.isnan(nilai) & ~np.isnan(isi)
+    nilai[musim] = isi[musim]
+    baru[kolom_rollup] = nilai
+    baru['gap_interpolasi'] = np.zeros(len(baru), dtype='uint16')
+    baru['gap_musiman'] = bitmask(musim)
+
+    # arah angin kosong diisi nilai sebelumnya pada stasiun yang sama, termasuk dari data sebelumnya
+    wd = baru.groupby('station', observed=True)['wd'].ffill()
+    kode_wd = np.where(wd.isna(), stream['wd_terakhir'][kode_station], wd.cat.codes)
+    baru['wd'] = pd.Categorical.from_codes(kode_wd, dtype=dtype_kolom['wd'])
+    baru['wd'] = baru.groupby('station', observed=True)['wd'].bfill()
+    akhir = np.append(kode_station[1:] != kode_station[:-1], True)
+    kode_wd = baru['wd'].cat.codes.to_numpy()
+    ada = akhir & (kode_wd >= 0)
+    stream['wd_terakhir'][kode_station[ada]] = kode_wd[ada]
+
+    baru = tambah_label(baru).sort_values(['datetime', 'station'], kind='stable')
+
+    # data baru biasanya setelah jam terakhir, sehingga cukup ditambahkan di akhir;
+    # jika ada data terlambat, hanya bagian mulai jam paling awal data baru yang diurutkan ulang
+    df_label = stream['df_label']
+    mulai = baru['datetime'].iloc[0]
+    posisi = int(df_label['datetime'].searchsorted(mulai))
+    ekor = pd.concat([df_label.iloc[posisi:], baru[df_label.columns]], ignore_index=True)
+    if posisi < len(df_label):
+        ekor = ekor.sort_values(['datetime', 'station'], kind='stable')
+    stream['df_label'] = pd.concat([df_label.iloc[:posisi], ekor], ignore_index=True)
+    stream['df_index'] = tambah_index(
+        potong_index(stream['df_index'], (mulai.year, mulai.month, mulai.day, mulai.hour)),
+        ekor[['year', 'month', 'day', 'hour']].to_numpy(), offset=posisi,
+    )
+
+    # cube dan versi_jam ditulis pada salinan baru (diperbesar jika data melewati jam terakhir),
+    # array lama tetap utuh untuk sesi yang sedang membacanya di luar lock
+    stream['versi'] += 1
+    jam = ((baru['datetime'] - waktu_awal) // pd.Timedelta(hours=1)).to_numpy()
+    tambahan = max(int(jam.max()) + 1 - cube.shape[1], 0)
+    cube = np.concatenate([cube, np.full((cube.shape[0], tambahan, cube.shape[2]), np.nan, dtype='float32')], axis=1)
+    versi_jam = np.concatenate([versi_jam, np.zeros(tambahan, dtype='int32')])
+    cube[baru['station'].cat.codes.to_numpy(), jam] = baru[polutan_cube].to_numpy(dtype='float32')
+    versi_jam[jam] = stream['versi']
+    stream['cube'], stream['versi_jam'] = cube, versi_jam
+
+    # data analisis dan rollup hanya berubah jika data baru berada pada tahun analisis
+    analisis = baru[~baru['year'].isin(tahun_dikecualikan)]
+    if len(analisis) > 0:
+        df_filtered = stream['df_filtered']
+        stream['df_filtered'] = pd.concat([df_filtered, analisis[df_filtered.columns]], ignore_index=True)
+        harian, jam_rollup = rollup_dasar(analisis)
+        rollups = stream['rollups']
+        stream['rollups'] = rollup_lengkap(
+            rollups['harian'].add(harian, fill_value=0),
+            rollups['jam'].add(jam_rollup, fill_value=0),
+        )
+        banyak, total = stream['versi_analisis']
+        hash_baris = pd.util.hash_pandas_object(analisis[df_filtered.columns], index=False).to_numpy()
+        stream['versi_analisis'] = (banyak + len(analisis), (total + int(hash_baris.sum(dtype='uint64'))) % 2**64)
+
+    stream['jumlah_baris'] += len(baru)
+    return len(baru)
+
+# Baca file CSV baru atau baris baru di akhir file pada folder stream_path, lalu tambahkan ke state stream
+# baris terakhir yang belum lengkap (masih ditulis) dibaca pada pemeriksaan berikutnya
+@diukur()
+def cek_data_masuk(stream, stream_path=stream_path):
+    if not os.path.isdir(stream_path):
+        return 0
+
+    jumlah = 0
+    with stream['lock']:
+        for file_name in sorted(os.listdir(path=stream_path)):
+            if not file_name.endswith(".csv"):
+                continue
+            path = os.path.join(stream_path, file_name)
+            stat = os.stat(path)
+            size, mtime, posisi = stream['files'].get(file_name, (0, 0, 0))
+            if (size, mtime) == (stat.st_size, stat.st_mtime_ns):
+                continue
+
+            with open(path, "rb") as f:
+                header = f.readline()
+                # file yang mengecil dianggap ditulis ulang
+                posisi = len(header) if posisi > stat.st_size else max(posisi, len(header))
+                f.seek(posisi)
+                isi = f.read()
+            isi = isi[:isi.rfind(b"\n") + 1]
+            stream['files'][file_name] = (stat.st_size, stat.st_mtime_ns, posisi + len(isi))
+
+            if isi:
+                jumlah += tambah_data(stream, pd.read_csv(io.BytesIO(header + isi), dtype=dtype_masuk))
+    return jumlah
+
+# Kolom yang dikorelasikan: polutan dan faktor meteorologi
+kolom_korelasi = kolom_rollup
+faktor_meteorologi = ['TEMP', 'PRES', 'DEWP', 'RAIN', 'WSPM']
+
+# Ranking setiap kolom di dalam setiap kelompok, cukup dihitung sekali lalu dipakai ulang untuk banyak korelasi
+# kelompok adalah tuple kolom pengelompokan, () berarti seluruh data satu kelompok
+# mengembalikan ranking (baris x kolom_korelasi) yang diurutkan per kelompok, posisi awal setiap kelompok dan nilai kuncinya
+@diukur()
+def ranking_kolom(df_filtered, kelompok=()):
+    if not kelompok:
+        return df_filtered[kolom_korelasi].rank().to_numpy(dtype='float64'), np.array([0]), pd.DataFrame(index=[0])
+
+    df = df_filtered.sort_values(list(kelompok), kind='stable')
+    ranks = df.groupby(list(kelompok), observed=True)[kolom_korelasi].rank().to_numpy(dtype='float64')
+
+    kunci = df[list(kelompok)].reset_index(drop=True)
+    starts = np.flatnonzero(np.append(True, (kunci.iloc[1:].to_numpy() != kunci.iloc[:-1].to_numpy()).any(axis=1)))
+    return ranks, starts, kunci.iloc[starts].reset_index(drop=True)
+
+# Korelasi pearson untuk banyak kelompok sekaligus, x adalah (baris x kolom) dengan baris setiap kelompok berurutan
+# setiap kelompok di-center lalu ditaruh pada tensor (kelompok x baris maksimum x kolom) berisi nol,
+# sehingga kovarians semua kelompok cukup dihitung dengan satu perkalian matriks batch
+def korelasi_batch(x, starts):
+    n = np.diff(np.append(starts, len(x)))
+    kelompok = np.repeat(np.arange(len(starts)), n)
+    posisi = np.arange(len(x)) - np.repeat(starts, n)
+
+    z = np.zeros((len(starts), n.max(), x.shape[1]))
+    z[kelompok, posisi] = x - (np.add.reduceat(x, starts, axis=0) / n[:, None])[kelompok]
+
+    cov = np.matmul(z.transpose(0, 2, 1), z)
+    std = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return cov / (std[:, :, None] * std[:, None, :])
+
+# Korelasi spearman (pearson dari ranking) antar polutan dan faktor meteorologi dari hasil ranking_kolom
+# tanpa kelompok menghasilkan satu matriks, dengan kelompok satu matriks per kelompok
+# dengan index baris kunci kelompok + kolom
+@diukur()
+def korelasi_ranking(ranking):
+    ranks, starts, kunci = ranking
+    corr = korelasi_batch(ranks, starts).reshape(-1, len(kolom_korelasi))
+
+    if kunci.shape[1] == 0:
+        return pd.DataFrame(corr, index=kolom_korelasi, columns=kolom_korelasi)
+
+    index = pd.MultiIndex.from_frame(kunci.loc[kunci.index.repeat(len(kolom_korelasi))].assign(kolom=kolom_korelasi * len(kunci)))
+    return pd.DataFrame(corr, index=index, columns=kolom_korelasi)
+
+# Korelasi spearman, misalnya kelompok=('station',) satu matriks per stasiun
+# dan ('station', 'year', 'month') satu matriks per stasiun per bulan
+def korelasi_spearman(df_filtered, kelompok=()):
+    return korelasi_ranking(ranking_kolom(df_filtered, kelompok))
+
+# Kode sektor arah angin uint8 (0 = N, searah jarum jam setiap 22.5°), arah_kosong untuk wd yang kosong
+arah_kosong = 255
+
+# Sudut (radian) setiap sektor dari utara searah jarum jam
+sudut_arah = np.deg2rad(np.arange(len(arah_angin)) * 360 / len(arah_angin))
+
+# Kolom wd (kategori arah_angin) menjadi kode sektor uint8
+def kode_arah(wd):
+    kode = wd.cat.codes.to_numpy()
+    return np.where(kode < 0, arah_kosong, kode).astype('uint8')
+
+# Komponen timur (sin) dan utara (cos) arah angin setiap baris, 0 untuk wd yang kosong
+def komponen_arah(kode):
+    ada = kode != arah_kosong
+    sudut = sudut_arah[np.where(ada, kode, 0)]
+    return np.where(ada, np.sin(sudut), 0).astype('float32'), np.where(ada, np.cos(sudut), 0).astype('float32')
+
+# Wind rose dan polutan per arah angin setiap stasiun, dihitung dengan bincount pada kunci (stasiun x 16 sektor)
+# untuk semua baris sekaligus; jam_tercemar adalah persentase jam PM2.5 kategori 'unhealthy' ke atas stasiun tersebut
+# yang datang dari sektor itu (atribusi arah sumber polusi)
+# mengembalikan tabel per (station, arah) dan arah sumber per stasiun: arah rata-rata vektor angin berbobot polutan
+# (sin/cos), kekuatan 0..1 menunjukkan seberapa terpusat arah tersebut
+@diukur()
+def analisis_arah_angin(df_filtered, polutan='PM2.5'):
+    stations = df_filtered['station'].cat.categories
+    kode = kode_arah(df_filtered['wd'])
+    ada = kode != arah_kosong
+    kunci = df_filtered['station'].cat.codes.to_numpy('int64')[ada] * len(arah_angin) + kode[ada]
+    n_kunci = len(stations) * len(arah_angin)
+
+    jam = np.bincount(kunci, minlength=n_kunci)
+    tabel = {'jam': jam}
+    for kolom in polutan_cube + ['WSPM']:
+        nilai = df_filtered[kolom].to_numpy('float64')[ada]
+        valid = ~np.isnan(nilai)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            tabel[kolom] = np.bincount(kunci[valid], nilai[valid], n_kunci) / np.bincount(kunci[valid], minlength=n_kunci)
+
+    tercemar = df_filtered['PM2.5'].to_numpy()[ada] > breakpoint_aqi['PM2.5'][label_aqi.index('unhealthy') - 1]
+    jam_tercemar = np.bincount(kunci[tercemar], minlength=n_kunci).reshape(len(stations), -1)
+    jam = jam.reshape(len(stations), -1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # stasiun tanpa data arah angin atau tanpa jam tercemar bernilai 0 di semua arah (bukan 0/0)
+        tabel['frekuensi'] = (jam / np.maximum(jam.sum(axis=1, keepdims=True), 1) * 100).ravel()
+        tabel['jam_tercemar'] = (jam_tercemar / np.maximum(jam_tercemar.sum(axis=1, keepdims=True), 1) * 100).ravel()
+    tabel = pd.DataFrame(tabel, index=pd.MultiIndex.from_product([stations, arah_angin], names=['station', 'arah']))
+
+    # arah sumber: jumlah vektor (sin, cos) berbobot polutan per stasiun
+    sin, cos = komponen_arah(kode)
+    bobot = np.nan_to_num(df_filtered[polutan].to_numpy('float64'))
+    kode_station = df_filtered['station'].cat.codes.to_numpy('int64')
+    total_sin = np.bincount(kode_station, sin * bobot, len(stations))
+    total_cos = np.bincount(kode_station, cos * bobot, len(stations))
+    total = np.bincount(kode_station, bobot * ada, len(stations))
+    derajat = np.rad2deg(np.arctan2(total_sin, total_cos)) % 360
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sumber = pd.DataFrame({
+            'derajat': derajat.round(1),
+            'arah': np.array(arah_angin)[np.round(derajat / 22.5).astype(int) % len(arah_angin)],
+            'kekuatan': (np.hypot(total_sin, total_cos) / total).round(3),
+        }, index=pd.Index(stations, name='station'))
+    return tabel, sumber
+
+# Perhitungan setiap analisis dari tabel rollup, visualisasinya ada di grafik_udara.py
+def hitung_ratu1(rollups):
+    # komponen polutan
+    polutan = ['PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3']
+
+    # menghitung rata rata polutan per hari untuk setiap tahun dan setiap stasiun
+    df_daily = rata_rata(rollups['harian'])[polutan].reset_index()
+
+    # menghitung total rata-rata polutan per hari
+    df_daily["polutan_average"] = df_daily[polutan].mean(axis=1)
+
+    # batas maksimum sudah di tentukan di awal analisis
+    threshold = 38.67
+
+    # menentukan stasiun yang menghadapi masalah polusi dimana rata-rata polutan > batas maksimum
+    df_polluted_stations = df_daily[df_daily["polutan_average"] > threshold]
+
+    # menampilkan stasiun yang memiliki masalah polusi beserta jumlah harinya
+    df_polluted_summary = df_polluted_stations.groupby("station", observed=True)["day"].count().reset_index()
+    df_polluted_summary.columns = ["station", "jumlah_hari_terpolusi"]
+    
+    df_polluted_summary = df_polluted_summary.sort_values(by="jumlah_hari_terpolusi", ascending=False)
+
+    df_heatmap = df_polluted_stations.pivot_table(
+        index="station",
+        columns="day",
+        values="polutan_average",
+        aggfunc="mean",
+        observed=True
+    )
+
+    return df_polluted_summary, df_heatmap
+
+def hitung_ratu2(df_filtered):
+    corr_factors = korelasi_spearman(df_filtered) # menggunakan metode spearman untuk data berdistribusi tidak normal
+    return corr_factors
+
+def hitung_salsa1(rollups):
+    # Definisikan jam rush hour (7-9 pagi dan 5-7 sore)
+    jam = rollups['jam']
+    hour = jam.index.get_level_values('hour')
+    is_rush = (hour >= 7) & (hour <= 9) | (hour >= 17) & (hour <= 19)
+    rush_hours = jam[is_rush].sum()
+    off_peak_hours = jam[~is_rush].sum()
+
+    # Hitung rata-rata polutan untuk rush hour
+    rush_avg = rata_rata(rush_hours)[['PM2.5', 'PM10', 'SO2']]
+
+    # Hitung rata-rata polutan untuk off-peak hours
+    off_peak_avg = rata_rata(off_peak_hours)[['PM2.5', 'PM10', 'SO2']]
+
+    return rush_avg, off_peak_avg
+
+def hitung_rafly1(rollups):
+    # Filter data untuk station Tiantan dan tahun 2014-2016
+    tiantan_data = rata_rata(rollups['bulanan']).loc['Tiantan']
+
+    # Hitung rata-rata PM10 per bulan untuk setiap tahun
+    pm10_per_bulan = tiantan_data['PM10'].unstack()
+
+    # Mengganti angka bulan dengan nama bulan
+    nama_bulan = {
+        1: 'Januari', 2: 'Februari', 3: 'Maret', 4: 'April',
+        5: 'Mei', 6: 'Juni', 7: 'Juli', 8: 'Agustus',
+        9: 'September', 10: 'Oktober', 11: 'November', 12: 'Desember'
+    }
+    pm10_per_bulan.columns = [nama_bulan[col] for col in pm10_per_bulan.columns]
+    return pm10_per_bulan
+
+def hitung_rafly2(rollups):
+    # data untuk Stasiun Tiantan dan tahun 2016 (per jam dalam sehari)
+    tiantan_2016 = rollups['jam'].loc[('Tiantan', 2016)]
+
+    # Memisahkan data untuk pagi (06:00 - 10:00)
+    data_pagi = tiantan_2016.loc[6:10].sum()
+
+    # Memisahkan data untuk sore (15:00 - 19:00)
+    data_sore = tiantan_2016.loc[15:19].sum()
+
+    # Menghitung rata-rata O₃ untuk pagi hari (06:00 - 10:00)
+    avg_o3_pagi = rata_rata(data_pagi)['O3']
+
+    # Menghitung rata-rata O₃ untuk sore hari (15:00 - 19:00)
+    avg_o3_sore = rata_rata(data_sore)['O3']
+
+    return avg_o3_pagi, avg_o3_sore
+
+def hitung_army1(rollups):
+
+    selected_columns = ['station', 'PM2.5', 'PM10']
+
+    # Memfilter data berdasarkan nama stasiun
+    stations_filter = ['Dingling', 'Guanyuan', 'Huairou']
+    # Filter by station and year (rata-rata tahunan)
+    tahunan = rata_rata(rollups['tahunan']).reset_index()
+    filter_data = tahunan[(tahunan['station'].isin(stations_filter)) & (tahunan['year'] == 2015)][selected_columns]
+    filter_data['station'] = filter_data['station'].astype(str)
+
+    return filter_data.melt(id_vars=['station'], value_vars=['PM2.5', 'PM10'], var_name='Polutan', value_name='Konsentrasi')
+
+# Deret waktu satu stasiun dari cube: array waktu (per jam) dan array nilai (jam x polutan) yang contiguous
+# mulai dan selesai adalah batas waktu inklusif
+def deret_stasiun(cube, waktu_awal, stations, station, mulai, selesai):
+    jam_mulai = max((pd.Timestamp(mulai) - waktu_awal) // pd.Timedelta(hours=1), 0)
+    jam_selesai = min((pd.Timestamp(selesai) - waktu_awal) // pd.Timedelta(hours=1) + 1, cube.shape[1])
+
+    waktu = np.datetime64(waktu_awal, 'h') + np.arange(jam_mulai, jam_selesai)
+    return waktu, cube[stations.index(station), jam_mulai:jam_selesai]
+
+# Downsample dengan mengambil titik minimum dan maksimum di setiap bucket,
+# sehingga puncak dan lembah tetap terlihat; mengembalikan index titik yang dipakai
+def downsample_minmax(y, n_bucket):
+    n = len(y)
+    if n <= 2 * n_bucket:
+        return np.arange(n)
+
+    ukuran = -(-n // n_bucket)
+    n_bucket = -(-n // ukuran)
+    blok = np.pad(y, (0, ukuran * n_bucket - n), mode='edge').reshape(n_bucket, ukuran)
+    awal = np.arange(n_bucket) * ukuran
+
+    # nilai kosong diabaikan saat mencari minimum dan maksimum
+    kosong = np.isnan(blok)
+    idx_min = awal + np.where(kosong, np.inf, blok).argmin(axis=1)
+    idx_max = awal + np.where(kosong, -np.inf, blok).argmax(axis=1)
+
+    idx = np.sort(np.stack([idx_min, idx_max], axis=1), axis=1).ravel()
+    return np.minimum(idx, n - 1)
+
+# Model prediksi kualitas udara (LSTM dari forecasting_final.ipynb)
+model_path = 'model_prediksi.h5'
+scaler_path = 'scaler_prediksi.json'  # parameter MinMaxScaler saat training, disimpan dari forecasting_final.ipynb
+selected_features = ['PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3']  # fitur yang digunakan dalam model
+n_input = 24  # jumlah jam input model
+
+# Load model dengan warm-up, tensorflow baru di-import saat model dibutuhkan
+# mengembalikan model dan waktu load serta waktu inferensi pertama (detik)
+@diukur()
+def muat_model(model_path=model_path):
+    mulai = time.perf_counter()
+    import tensorflow as tf
+    model = tf.keras.models.load_model(model_path, custom_objects={'mse': 'mean_squared_error'})
+    waktu_load = time.perf_counter() - mulai
+
+    # Warm-up: inferensi pertama memicu tracing graph, jadi dilakukan di sini bukan saat user memprediksi
+    # (predict untuk prediksi batch, predict_on_batch untuk prediksi rekursif per langkah)
+    mulai = time.perf_counter()
+    dummy = np.zeros((1, n_input, len(selected_features)), dtype='float32')
+    model.predict(dummy, verbose=0)
+    model.predict_on_batch(dummy)
+    waktu_inferensi_pertama = time.perf_counter() - mulai
+
+    return model, {'waktu_load': waktu_load, 'waktu_inferensi_pertama': waktu_inferensi_pertama}
+
+# Load parameter scaler training, diurutkan sesuai selected_features
+def muat_scaler(scaler_path=scaler_path):
+    with open(scaler_path) as f:
+        params = json.load(f)
+
+    idx = [params['fitur'].index(fitur) for fitur in selected_features]
+    data_min = np.asarray(params['data_min'], dtype='float32')[idx]
+    data_range = np.asarray(params['data_max'], dtype='float32')[idx] - data_min
+    data_range[data_range == 0] = 1  # sama seperti MinMaxScaler untuk kolom konstan
+    return {'min': data_min, 'scale': 1 / data_range}
+
+# Normalisasi min-max dengan parameter training (transformasi affine, tanpa fit ulang)
+def normalisasi(scaler, x):
+    return (np.asarray(x, dtype='float32') - scaler['min']) * scaler['scale']
+
+# Kebalikan dari normalisasi, untuk mendapatkan nilai asli
+def denormalisasi(scaler, x):
+    return np.asarray(x, dtype='float32') / scaler['scale'] + scaler['min']
+
+# Semua sliding window n_input jam dari deret (jam x fitur), hasilnya (n_window x n_input x fitur) tanpa menyalin data
+def sliding_windows(nilai, n_input=n_input):
+    return np.lib.stride_tricks.sliding_window_view(nilai, (n_input, nilai.shape[1]))[:, 0]
+
+# Prediksi 1 jam ke depan untuk banyak stasiun dan banyak window sekaligus
+# deret: dict station -> (waktu per jam, nilai jam x fitur); setiap window menghasilkan prediksi untuk jam setelahnya
+# semua window ditumpuk menjadi satu tensor dan diprediksi dengan sekali panggilan model.predict
+@diukur()
+def prediksi_batch(model, scaler, deret, batch_size=256):
+    windows, stations, waktu_target = [], [], []
+    for station, (waktu, nilai) in deret.items():
+        if len(nilai) < n_input:
+            continue
+        # normalisasi seluruh deret sekali, bukan per window
+        windows.append(sliding_windows(normalisasi(scaler, nilai)))
+        waktu_target.append(waktu[n_input - 1:] + np.timedelta64(1, 'h'))
+        stations.append(np.full(len(windows[-1]), station, dtype=object))
+
+    if not windows:
+        return pd.DataFrame(columns=['station', 'datetime'] + selected_features + ['Status'])
+
+    x = np.concatenate(windows).astype('float32')
+    predicted_pollution = denormalisasi(scaler, model.predict(x, batch_size=batch_size, verbose=0))
+
+    df_predicted = pd.DataFrame(predicted_pollution, columns=selected_features)
+    df_predicted.insert(0, 'station', np.concatenate(stations))
+    df_predicted.insert(1, 'datetime', np.concatenate(waktu_target))
+    df_predicted['Status'] = label_kualitas_udara(df_predicted['PM2.5'])
+    return df_predicted
+
+# Prediksi beberapa jam ke depan secara rekursif: setiap hasil prediksi menjadi input jam berikutnya
+# windows: (n_input x fitur) atau (batch x n_input x fitur) dalam satuan asli, dinormalisasi sekali di awal
+# window disimpan dalam ring buffer dua kali panjang n_input, sehingga setiap langkah hanya menulis satu baris
+# dan input model selalu berupa slice buffer yang berurutan tanpa menyalin ulang window
+# mengembalikan prediksi (batch x horizon x fitur) dalam satuan asli dan latensi setiap langkah (detik)
+@diukur()
+def prediksi_rekursif(model, scaler, windows, horizon):
+    windows = np.asarray(windows, dtype='float32')
+    if windows.ndim == 2:
+        windows = windows[np.newaxis]
+    n_batch, n_jam, n_fitur = windows.shape
+
+    buffer = np.empty((n_batch, 2 * n_jam, n_fitur), dtype='float32')
+    buffer[:, :n_jam] = normalisasi(scaler, windows)
+    buffer[:, n_jam:] = buffer[:, :n_jam]
+
+    hasil = np.empty((n_batch, horizon, n_fitur), dtype='float32')
+    latensi = []
+    head = 0
+    for step in range(horizon):
+        mulai = time.perf_counter()
+        prediksi = np.asarray(model.predict_on_batch(buffer[:, head:head + n_jam]))
+        latensi.append(time.perf_counter() - mulai)
+
+        hasil[:, step] = prediksi
+        buffer[:, head] = prediksi
+        buffer[:, head + n_jam] = prediksi
+        head = (head + 1) % n_jam
+
+    hasil = denormalisasi(scaler, hasil)
+    return hasil, latensi
+
+# Deret input dari cube untuk memprediksi setiap jam antara mulai dan selesai (inklusif) pada stasiun yang dipilih
+def deret_prediksi(cube, waktu_awal, stations, station_pilihan, mulai, selesai):
+    idx_fitur = [polutan_cube.index(fitur) for fitur in selected_features]
+    deret = {}
+    for station in station_pilihan:
+        waktu, nilai = deret_stasiun(
+            cube, waktu_awal, stations, station,
+            pd.Timestamp(mulai) - pd.Timedelta(hours=n_input), pd.Timestamp(selesai) - pd.Timedelta(hours=1),
+        )
+        deret[station] = (waktu, nilai[:, idx_fitur])
+    return deret
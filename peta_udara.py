@@ -0,0 +1,78 @@
+# Peta kualitas udara dengan folium, tanpa streamlit
+# dipakai oleh TubesStreamlit.py (dengan cache per key) dan benchmark.py
+import numpy as np
+import pandas as pd
+import folium
+from folium.plugins import TimestampedGeoJson
+
+from kualitas_udara import stations_coordinates, label_kualitas_udara, dtype_label, warna_label
+
+# Peta dari array lat, lon, kode label, nilai PM2.5 dan nama station
+# stasiun tanpa koordinat (lat/lon NaN, misalnya stasiun baru dari data masuk) dilewati
+def buat_peta(lat, lon, kode_label, nilai, station):
+    # Semua stasiun digabung menjadi satu layer GeoJSON
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {
+                "color": warna_label[kode],
+                "popup": f"{station} (PM2.5: {nilai}, Label: {dtype_label.categories[kode]})",
+            },
+        }
+        for lat, lon, kode, nilai, station in zip(
+            np.asarray(lat).tolist(), np.asarray(lon).tolist(),
+            np.asarray(kode_label).tolist(), np.asarray(nilai).tolist(), list(station),
+        )
+        if not (np.isnan(lat) or np.isnan(lon))
+    ]
+
+    # Buat peta dengan pusat di lokasi yang lebih umum (misalnya pusat China)
+    map_china = folium.Map(location=[40.09, 116.6], zoom_start=10)
+
+    folium.GeoJson(
+        {"type": "FeatureCollection", "features": features},
+        marker=folium.CircleMarker(radius=15, fill=True, fill_opacity=0.7),
+        style_function=lambda feature: {
+            "color": feature["properties"]["color"],
+            "fillColor": feature["properties"]["color"],
+        },
+        popup=folium.GeoJsonPopup(fields=["popup"], labels=False),
+    ).add_to(map_china)
+
+    return map_china
+
+# Peta animasi, nilai adalah slice cube berukuran (stasiun x jam) untuk satu polutan
+# (animasi berjalan di browser, server hanya membangun layer sekali), stasiun tanpa koordinat dilewati
+def buat_peta_animasi(nilai, stations, waktu_mulai, polutan):
+    waktu = pd.date_range(waktu_mulai, periods=nilai.shape[1], freq='h').strftime('%Y-%m-%dT%H:%M:%S').tolist()
+    kode_label = label_kualitas_udara(nilai.ravel(), polutan).codes.reshape(nilai.shape)
+
+    features = []
+    for s, t in zip(*np.nonzero(~np.isnan(nilai))):
+        koordinat = stations_coordinates.get(stations[s])
+        if koordinat is None:
+            continue
+        warna = warna_label[kode_label[s, t]]
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [koordinat["lon"], koordinat["lat"]]},
+            "properties": {
+                "times": [waktu[t]],
+                "popup": f"{stations[s]} ({polutan}: {nilai[s, t]:.1f}, Label: {dtype_label.categories[kode_label[s, t]]})",
+                "icon": "circle",
+                "iconstyle": {"color": warna, "fillColor": warna, "fillOpacity": 0.7, "radius": 15},
+            },
+        })
+
+    map_china = folium.Map(location=[40.09, 116.6], zoom_start=10)
+    TimestampedGeoJson(
+        {"type": "FeatureCollection", "features": features},
+        period='PT1H',
+        duration='PT1H',
+        add_last_point=False,
+        auto_play=False,
+        date_options='YYYY-MM-DD HH:mm',
+    ).add_to(map_china)
+
+    return map_china
@@ -0,0 +1,32 @@
+# Fixture dan helper bersama untuk test: data PRSA kecil yang ditulis ke folder dataset sementara
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kualitas_udara as ku
+
+# Data per jam satu stasiun dengan kolom dan format file PRSA, mulai dari waktu mulai sebanyak n_jam
+def data_prsa(station, mulai, n_jam, seed=0):
+    rng = np.random.default_rng(seed)
+    waktu = pd.date_range(mulai, periods=n_jam, freq='h')
+    return pd.DataFrame({
+        'No': np.arange(1, n_jam + 1),
+        'year': waktu.year, 'month': waktu.month, 'day': waktu.day, 'hour': waktu.hour,
+        **{kolom: np.round(rng.uniform(5, 300, n_jam), 1) for kolom in ku.kolom_rollup},
+        'wd': rng.choice(ku.arah_angin, n_jam),
+        'station': station,
+    })
+
+# Tulis beberapa frame data_prsa ke folder dataset sementara, satu file CSV per frame
+@pytest.fixture
+def folder_dataset(tmp_path):
+    def tulis(*frames):
+        for df in frames:
+            df.to_csv(tmp_path / f"PRSA_Data_{df['station'].iloc[0]}.csv", index=False)
+        return str(tmp_path)
+    return tulis
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+import kualitas_udara as ku
+
+waktu_awal = pd.Timestamp('2016-01-01 00:00')
+stations = ['Dongsi', 'Tiantan', 'Wanliu']
+
+# Cube acak 3 stasiun dengan ekor NaN pada stasiun lain (seperti setelah data stream menambah jam untuk satu stasiun)
+def cube_ekor_nan(n_jam=500, ekor=48, seed=0):
+    rng = np.random.default_rng(seed)
+    cube = rng.uniform(5, 400, (len(stations), n_jam + ekor, len(ku.polutan_cube))).astype('float32')
+    cube[rng.random(cube.shape) < 0.05] = np.nan
+    cube[1:, n_jam:] = np.nan
+    cube[0, n_jam - 1, 0] = 10
+    cube[0, n_jam:, 0] = 600
+    return cube
+
+# Episode dengan loop biasa: setiap rangkaian jam berurutan dengan kategori >= kategori pada satu stasiun
+def episode_naif(cube, kategori):
+    batas = ku.dtype_label.categories.get_loc(kategori)
+    hasil = []
+    for s, station in enumerate(stations):
+        kode = ku.label_kualitas_udara(cube[s, :, 0]).codes
+        jam = 0
+        while jam < len(kode):
+            if kode[jam] < batas:
+                jam += 1
+                continue
+            akhir = jam
+            while akhir < len(kode) and kode[akhir] >= batas:
+                akhir += 1
+            nilai = cube[s, jam:akhir, 0]
+            hasil.append((station, jam, akhir - jam, nilai.max(), jam + int(np.argmax(nilai))))
+            jam = akhir
+    return sorted(hasil, key=lambda episode: (episode[1], episode[0]))
+
+def test_index_episode_ekor_nan_sama_dengan_loop():
+    cube = cube_ekor_nan()
+    index = ku.index_episode(cube, waktu_awal, stations)
+
+    for kategori in ku.kategori_episode:
+        tabel = index[kategori]
+        assert not tabel['puncak'].isna().any(), kategori
+        assert (np.diff(tabel['durasi'].to_numpy()) <= 0).all(), kategori
+
+        hasil = sorted(zip(
+            tabel['station'].astype(str), tabel['jam_mulai'], tabel['durasi'], tabel['puncak'],
+            (tabel['waktu_puncak'] - waktu_awal) // pd.Timedelta(hours=1),
+        ), key=lambda episode: (episode[1], episode[0]))
+        assert hasil == episode_naif(cube, kategori), kategori
+
+        selesai = tabel['mulai'] + pd.to_timedelta(tabel['durasi'] - 1, unit='h')
+        assert (tabel['selesai'] == selesai).all(), kategori
+
+def test_cari_episode_durasi_dan_station():
+    index = ku.index_episode(cube_ekor_nan(), waktu_awal, stations)
+
+    for kategori in ku.kategori_episode:
+        tabel = index[kategori]
+        for durasi_min in [1, 2, 3, 5, 48, 1000]:
+            hasil = ku.cari_episode(index, kategori, durasi_min)
+            pd.testing.assert_frame_equal(hasil, tabel[tabel['durasi'] >= durasi_min])
+
+            hasil = ku.cari_episode(index, kategori, durasi_min, station='Dongsi')
+            harapan = tabel[(tabel['durasi'] >= durasi_min) & (tabel['station'] == 'Dongsi')]
+            pd.testing.assert_frame_equal(hasil, harapan)
+
+    # ekor 600 µg/m³ di Dongsi adalah satu episode 'hazardous' 48 jam
+    terpanjang = ku.cari_episode(index, 'hazardous', 48)
+    assert terpanjang['station'].tolist() == ['Dongsi']
+    assert terpanjang['durasi'].tolist() == [48]
+    assert terpanjang['puncak'].tolist() == [600]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import kualitas_udara as ku
+
+# Data analisis kecil dengan nilai berulang (ties) agar ranking rata-rata ikut diuji
+def data_korelasi(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({kolom: rng.integers(0, 40, n).astype('float32') for kolom in ku.kolom_korelasi})
+    df['PM10'] = df['PM2.5'] * 1.5 + rng.normal(0, 5, n).astype('float32')
+    df['station'] = pd.Categorical(rng.choice(['Dongsi', 'Tiantan', 'Wanliu'], n))
+    df['year'] = rng.choice([2014, 2015], n)
+    return df
+
+def test_korelasi_spearman_sama_dengan_scipy():
+    df = data_korelasi()
+    hasil = ku.korelasi_spearman(df)
+    harapan = stats.spearmanr(df[ku.kolom_korelasi]).statistic
+    np.testing.assert_allclose(hasil.to_numpy(), harapan, rtol=1e-9, atol=1e-12)
+
+def test_korelasi_spearman_per_kelompok_sama_dengan_scipy():
+    df = data_korelasi()
+    hasil = ku.korelasi_spearman(df, ('station', 'year'))
+
+    kelompok = df.groupby(['station', 'year'], observed=True)
+    assert len(hasil) == kelompok.ngroups * len(ku.kolom_korelasi)
+    for (station, year), bagian in kelompok:
+        harapan = stats.spearmanr(bagian[ku.kolom_korelasi]).statistic
+        np.testing.assert_allclose(hasil.loc[(station, year)].to_numpy(), harapan, rtol=1e-9, atol=1e-12)
+
+# Kelompok dengan jumlah baris berbeda: baris nol pada tensor batch tidak mengubah korelasi kelompok yang lebih pendek
+def test_korelasi_batch_kelompok_tidak_sama_panjang():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(50, 4))
+    starts = np.array([0, 7, 30])
+
+    hasil = ku.korelasi_batch(x, starts)
+    for i, (awal, akhir) in enumerate(zip(starts, np.append(starts[1:], len(x)))):
+        np.testing.assert_allclose(hasil[i], np.corrcoef(x[awal:akhir], rowvar=False), rtol=1e-9, atol=1e-12)
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+import peta_udara as peta
+
+# Stasiun tanpa koordinat (misalnya stasiun baru dari data masuk) dilewati, bukan KeyError atau NaN di GeoJSON
+def test_peta_animasi_stasiun_tanpa_koordinat():
+    nilai = np.array([[10, 80, np.nan], [200, 300, 400]], dtype='float32')
+    map_china = peta.buat_peta_animasi(nilai, ['Dongsi', 'StasiunBaru'], pd.Timestamp('2017-03-01'), 'PM2.5')
+    html = map_china.get_root().render()
+    assert 'Dongsi (PM2.5: 80.0' in html
+    assert 'StasiunBaru' not in html
+
+def test_peta_stasiun_tanpa_koordinat():
+    map_china = peta.buat_peta([39.93, np.nan], [116.42, np.nan], [2, 5], [50.0, 200.0], ['Dongsi', 'StasiunBaru'])
+    html = map_china.get_root().render()
+    assert 'Dongsi (PM2.5: 50.0' in html
+    assert 'StasiunBaru' not in html
+    assert 'NaN' not in html
@@ -0,0 +1,50 @@
+import numpy as np
+
+import kualitas_udara as ku
+
+# Model pengganti LSTM: prediksi jam berikutnya adalah kombinasi linear dari seluruh window
+class ModelLinear:
+    def __init__(self, n_jam, n_fitur, seed=0):
+        rng = np.random.default_rng(seed)
+        self.bobot = rng.normal(0, 0.05, (n_jam * n_fitur, n_fitur)).astype('float32')
+
+    def predict_on_batch(self, x):
+        x = np.asarray(x, dtype='float32')
+        return x.reshape(len(x), -1) @ self.bobot
+
+def scaler_uji(n_fitur):
+    return {'min': np.linspace(0, 10, n_fitur, dtype='float32'), 'scale': np.full(n_fitur, 1 / 300, dtype='float32')}
+
+# Rekursif biasa: geser window satu jam dan tambahkan prediksi di akhir
+def prediksi_naif(model, scaler, windows, horizon):
+    window = ku.normalisasi(scaler, windows)
+    hasil = []
+    for _ in range(horizon):
+        prediksi = model.predict_on_batch(window)
+        hasil.append(prediksi)
+        window = np.concatenate([window[:, 1:], prediksi[:, np.newaxis]], axis=1)
+    return ku.denormalisasi(scaler, np.stack(hasil, axis=1))
+
+def test_prediksi_rekursif_sama_dengan_loop():
+    n_fitur = len(ku.selected_features)
+    model = ModelLinear(ku.n_input, n_fitur)
+    scaler = scaler_uji(n_fitur)
+    windows = np.random.default_rng(1).uniform(5, 300, (3, ku.n_input, n_fitur)).astype('float32')
+
+    # horizon lebih dari dua kali n_input agar ring buffer berputar beberapa kali
+    horizon = 2 * ku.n_input + 5
+    hasil, latensi = ku.prediksi_rekursif(model, scaler, windows, horizon)
+
+    assert hasil.shape == (3, horizon, n_fitur)
+    assert len(latensi) == horizon
+    np.testing.assert_allclose(hasil, prediksi_naif(model, scaler, windows, horizon), rtol=1e-4, atol=1e-3)
+
+# Satu window (n_input x fitur) diperlakukan sebagai batch berisi satu
+def test_prediksi_rekursif_satu_window():
+    n_fitur = len(ku.selected_features)
+    model = ModelLinear(ku.n_input, n_fitur, seed=2)
+    scaler = scaler_uji(n_fitur)
+    window = np.random.default_rng(3).uniform(5, 300, (ku.n_input, n_fitur)).astype('float32')
+
+    hasil, _ = ku.prediksi_rekursif(model, scaler, window, 5)
+    np.testing.assert_allclose(hasil, prediksi_naif(model, scaler, window[np.newaxis], 5), rtol=1e-4, atol=1e-3)
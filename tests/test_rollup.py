@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+import kualitas_udara as ku
+from conftest import data_prsa
+
+def siapkan(folder):
+    partisi_path, stat = ku.siapkan_dataset(folder, ku.signature_dataset(folder), n_worker=1)
+    return partisi_path, stat
+
+# Stasiun baru yang hanya punya data 2017 (di luar tahun analisis) tidak menggagalkan rollup dan state stream
+def test_rollup_stasiun_tanpa_tahun_analisis(folder_dataset):
+    folder = folder_dataset(
+        data_prsa('Dongsi', '2014-12-31 00:00', 72),
+        data_prsa('Tiantan', '2017-01-01 00:00', 48, seed=1),
+    )
+    partisi_path, stat = siapkan(folder)
+    rollups = ku.rollup_data(partisi_path, n_worker=1)
+
+    for rollup in rollups.values():
+        assert set(rollup.index.get_level_values('station')) == {'Dongsi'}
+        assert list(rollup['sum'].columns) == ku.kolom_rollup
+
+    df_cleaned, df_filtered = ku.cleaning_data(partisi_path)
+    stream = ku.buat_stream(partisi_path, stat, df_cleaned, df_filtered)
+    assert stream['stations'] == ['Dongsi', 'Tiantan']
+
+# Rata-rata dari tabel rollup sama dengan groupby langsung pada data analisis
+def test_rata_rata_rollup_sama_dengan_groupby(folder_dataset):
+    df = data_prsa('Dongsi', '2014-01-01 00:00', 24 * 70)
+    df.loc[df.index % 7 == 0, 'PM2.5'] = np.nan
+    folder = folder_dataset(df, data_prsa('Tiantan', '2015-06-01 00:00', 24 * 40, seed=2))
+    partisi_path, _ = siapkan(folder)
+    rollups = ku.rollup_data(partisi_path, n_worker=1)
+    _, df_filtered = ku.cleaning_data(partisi_path)
+
+    for nama, kunci in [('harian', ['station', 'year', 'month', 'day']), ('bulanan', ['station', 'year', 'month']),
+                        ('tahunan', ['station', 'year']), ('jam', ['station', 'year', 'hour'])]:
+        langsung = df_filtered.groupby(kunci, observed=True)[ku.kolom_rollup].mean()
+        hasil = ku.rata_rata(rollups[nama]).reindex(langsung.index)
+        pd.testing.assert_frame_equal(hasil, langsung, check_dtype=False, check_names=False, rtol=1e-5)